@@ -0,0 +1,214 @@
+# Stand-in for the unreal module so the importer can run outside of the editor, used by runBenchmark.py
+# Install it with sys.modules["unreal"] = fakeUnreal before importing figmaApi
+# Calls to the importer library, asset library and asset tools are counted in Calls and assets only exist in memory
+
+import os
+import collections
+
+Calls = collections.Counter()
+Assets = {} # Asset path without the object name -> Asset
+Directories = set()
+ProjectDirectory = os.getcwd() + "/"
+PluginAssets = ["/FigmaImporter/WBP_FigmaFrame", "/FigmaImporter/Inter-VariableFont_slnt_wght_Font"]
+
+# Forget every asset and call, and use a new project directory for RawAssets
+def reset(NewProjectDirectory):
+    global ProjectDirectory
+    ProjectDirectory = os.path.join(NewProjectDirectory, "")
+    Calls.clear()
+    Assets.clear()
+    Directories.clear()
+    for Path in PluginAssets:
+        Assets[Path] = Asset(Path)
+
+# Removes the object name from a path, so /Game/A/WBP_A.WBP_A_C and /Game/A/WBP_A find the same asset
+def getPackagePath(Path):
+    return Path.split(".")[0]
+
+class Asset():
+    def __init__(self, Path, Size = None):
+        self.Path = Path
+        self.Size = Size or [0, 0]
+        self.Widgets = 0
+
+    def get_path_name(self):
+        return self.Path + "." + self.Path.split("/")[-1]
+
+    def blueprint_get_size_x(self):
+        return self.Size[0]
+
+    def blueprint_get_size_y(self):
+        return self.Size[1]
+
+# Structs and import tasks only need to hold their properties
+class Struct():
+    def __init__(self, *Values):
+        self.Values = Values
+        self.Properties = {}
+
+    def set_editor_property(self, Name, Value):
+        self.Properties[Name] = Value
+
+    def get_editor_property(self, Name):
+        return self.Properties.get(Name)
+
+class Vector2D(Struct):
+    pass
+
+class Vector4(Struct):
+    pass
+
+class LinearColor(Struct):
+    pass
+
+class SlateFontInfo(Struct):
+    pass
+
+class FigmaWidgetSpec(Struct):
+    pass
+
+class AssetImportTask(Struct):
+    pass
+
+class FigmaImporterStats(Struct):
+    pass
+
+class Font():
+    pass
+
+class FontFactory():
+    pass
+
+class FigmaWidgetType():
+    CHILD = 0
+    IMAGE = 1
+    RECTANGLE = 2
+    TEXT = 3
+
+class Paths():
+    @staticmethod
+    def project_dir():
+        return ProjectDirectory
+
+class ScopedSlowTask():
+    def __init__(self, Work, Label = ""):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *Args):
+        return False
+
+    def make_dialog(self, CanCancel = False):
+        pass
+
+    def should_cancel(self):
+        return False
+
+    def enter_progress_frame(self, Work = 1, Label = ""):
+        pass
+
+class EditorAssetLibrary():
+    @staticmethod
+    def does_directory_exist(Path):
+        Calls["EditorAssetLibrary.does_directory_exist"] += 1
+        return Path in Directories
+
+    @staticmethod
+    def make_directory(Path):
+        Calls["EditorAssetLibrary.make_directory"] += 1
+        Directories.add(Path)
+        return True
+
+    @staticmethod
+    def does_asset_exist(Path):
+        Calls["EditorAssetLibrary.does_asset_exist"] += 1
+        return getPackagePath(Path) in Assets
+
+    @staticmethod
+    def load_asset(Path):
+        Calls["EditorAssetLibrary.load_asset"] += 1
+        return Assets.get(getPackagePath(Path))
+
+    @staticmethod
+    def duplicate_asset(SourcePath, DestinationPath):
+        Calls["EditorAssetLibrary.duplicate_asset"] += 1
+        Assets[DestinationPath] = Asset(DestinationPath)
+        return Assets[DestinationPath]
+
+    @staticmethod
+    def save_loaded_asset(AssetToSave, only_if_is_dirty = True):
+        Calls["EditorAssetLibrary.save_loaded_asset"] += 1
+        Calls["SavedAssets"] += 1
+        return True
+
+    @staticmethod
+    def save_loaded_assets(AssetsToSave, only_if_is_dirty = True):
+        Calls["EditorAssetLibrary.save_loaded_assets"] += 1
+        Calls["SavedAssets"] += len(AssetsToSave)
+        return True
+
+# Imports read the size of each PNG so texture sizes match what Unreal would report
+class AssetTools():
+    def import_asset_tasks(self, Tasks):
+        Calls["AssetTools.import_asset_tasks"] += 1
+        for Task in Tasks:
+            Filename = Task.get_editor_property('filename')
+            with open(Filename, 'rb') as handler:
+                Header = handler.read(24)
+            Path = Task.get_editor_property('destination_path') + os.path.splitext(os.path.basename(Filename))[0]
+            if Filename.endswith(".png"):
+                Assets[Path] = Asset(Path, [int.from_bytes(Header[16:20], "big"), int.from_bytes(Header[20:24], "big")])
+                Calls["ImportedTextures"] += 1
+            else: # Font files become font faces
+                Assets[Path] = Asset(Path)
+                Calls["ImportedFonts"] += 1
+            Task.set_editor_property('imported_object_paths', [Assets[Path].get_path_name()])
+
+    def create_asset(self, AssetName, PackagePath, AssetClass, Factory):
+        Calls["AssetTools.create_asset"] += 1
+        Assets[PackagePath + AssetName] = Asset(PackagePath + AssetName)
+        return Assets[PackagePath + AssetName]
+
+class AssetToolsHelpers():
+    @staticmethod
+    def get_asset_tools():
+        return AssetTools()
+
+class FigmaImporterBPLibrary():
+    @staticmethod
+    def clear_content(FrameAsset):
+        Calls["FigmaImporterBPLibrary.clear_content"] += 1
+        FrameAsset.Widgets = 0
+
+    @staticmethod
+    def set_background(FrameAsset, Size, Color):
+        Calls["FigmaImporterBPLibrary.set_background"] += 1
+
+    @staticmethod
+    def build_widgets(FrameAsset, Specs):
+        Calls["FigmaImporterBPLibrary.build_widgets"] += 1
+        Calls["BuiltWidgets"] += len(Specs)
+        FrameAsset.Widgets += len(Specs)
+        return [None] * len(Specs)
+
+    @staticmethod
+    def set_font_face(Font, FontFace, TypefaceName):
+        Calls["FigmaImporterBPLibrary.set_font_face"] += 1
+
+    # Class and texture loads happen in C++ so only the widget counters can be reported here
+    @staticmethod
+    def get_stats():
+        Stats = FigmaImporterStats()
+        for Name in ["load_class_calls", "class_cache_hits", "load_object_calls", "texture_cache_hits", "build_widgets_seconds"]:
+            Stats.set_editor_property(Name, 0)
+        Stats.set_editor_property("build_widgets_calls", Calls["FigmaImporterBPLibrary.build_widgets"])
+        Stats.set_editor_property("widgets_built", Calls["BuiltWidgets"])
+        return Stats
+
+    @staticmethod
+    def reset_stats():
+        Calls["FigmaImporterBPLibrary.reset_stats"] += 1
+
+reset(ProjectDirectory)
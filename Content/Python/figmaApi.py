@@ -1,406 +1,341 @@
-import requests
+# Second stage of an import that runs inside Unreal, applying a plan made by figmaPlanner
+# Only the asset work happens here: creating blueprints, importing textures, building widgets and saving
+
 import json
 import unreal
 import os
+import time
+import figmaPlanner
+from figmaPlanner import Profiler, PlanVersion, DownloadWorkers, MaxRawAssetBytes, getRawImageDirectory
+
+ImportBatchSize = 200 # Max number of textures imported by a single import_asset_tasks call
+DefaultFontPath = "/FigmaImporter/Inter-VariableFont_slnt_wght_Font" # Font from the plugin used when a text's font couldn't be found
+DefaultTypefaceName = "Inter-VariableFont_slnt_wght"
+LibraryStats = ["load_class_calls", "class_cache_hits", "load_object_calls", "texture_cache_hits", "build_widgets_calls", "widgets_built", "build_widgets_seconds"] # Counters kept by the importer library
 
 # Helper function to check if an Unreal directory exists and make it if not
 def createDirSafe(DirectoryPath):
     if not unreal.EditorAssetLibrary.does_directory_exist(DirectoryPath):
         unreal.EditorAssetLibrary.make_directory(DirectoryPath)
 
-# Helper function to sanitise name to use with unreal paths
-def sanitiseName(Name):
-        SanitisedName = (Name.replace(" ", "_").
-                     replace("-", "_").
-                     replace("(", "").
-                     replace(")", "").
-                     replace(".", "_").
-                     replace("\"", "").
-                     replace(",", "").
-                     replace("\'", "").
-                     replace("“", "").
-                     replace("”", "").
-                     replace("[","").
-                     replace("]","").
-                     replace("=", "").
-                     replace("#", "").
-                     splitlines(False)[0][:50])
-        return SanitisedName
+# Copy the counters kept by the importer library since they were last reset
+def readLibraryStats(Profiler):
+    Stats = unreal.FigmaImporterBPLibrary.get_stats()
+    Profiler.Library = {Name : Stats.get_editor_property(Name) for Name in LibraryStats}
 
-# Gets full path to bluerint class
-def getAssetPath(Directory, AssetName):
-    Path = Directory + AssetName + "." + AssetName + "_C"
-    return Path
+# Reads a plan written by figmaPlanner
+def loadPlan(Path):
+    with open(Path, 'r') as handler:
+        return json.load(handler)
 
-# Create unique instance name to avoid conflicts
-def createInsatanceName(Name, id):
-    return Name + "_" + id
+# Turns a widget from the plan into the spec the importer library builds
+def createWidgetSpec(SpecDict, Fonts):
+    Spec = unreal.FigmaWidgetSpec()
+    Spec.set_editor_property('type', getattr(unreal.FigmaWidgetType, SpecDict["Type"]))
+    Spec.set_editor_property('name', SpecDict["Name"])
+    Spec.set_editor_property('size', unreal.Vector2D(SpecDict["Size"][0], SpecDict["Size"][1]))
+    Spec.set_editor_property('position', unreal.Vector2D(SpecDict["Position"][0], SpecDict["Position"][1]))
+    Spec.set_editor_property('alignment', unreal.Vector2D(SpecDict["Alignment"][0], SpecDict["Alignment"][1]))
+    Spec.set_editor_property('min_anchors', unreal.Vector2D(SpecDict["MinAnchors"][0], SpecDict["MinAnchors"][1]))
+    Spec.set_editor_property('max_anchors', unreal.Vector2D(SpecDict["MaxAnchors"][0], SpecDict["MaxAnchors"][1]))
+    if "AssetPath" in SpecDict:
+        Spec.set_editor_property('asset_path', SpecDict["AssetPath"])
+    if "UVRegion" in SpecDict:
+        Spec.set_editor_property('uv_region', unreal.Vector4(*SpecDict["UVRegion"]))
+    if "Color" in SpecDict:
+        Spec.set_editor_property('color', unreal.LinearColor(*SpecDict["Color"]))
+    if "CornerRadii" in SpecDict:
+        Spec.set_editor_property('corner_radii', unreal.Vector4(*SpecDict["CornerRadii"]))
+    if "OutlineColor" in SpecDict:
+        Spec.set_editor_property('outline_color', unreal.LinearColor(*SpecDict["OutlineColor"]))
+        Spec.set_editor_property('outline_width', SpecDict["OutlineWidth"])
+    if "Text" in SpecDict:
+        Spec.set_editor_property('text', SpecDict["Text"])
+        Spec.set_editor_property('font', Fonts.getFont(SpecDict["Font"]))
+    return Spec
 
-# Convert Fills into a single colour
-def getColorFromFills(Fills, DefaultColor):
-        try: # May not have a background colour
-            Color = {
-                                "r" : Fills[0]["color"]["r"],
-                                "g" : Fills[0]["color"]["g"],
-                                "b" : Fills[0]["color"]["b"],
-                             }
-            try: # Only has opacity attribute if opacity not 1
-                Color["a"] = Fills[0]["opacity"]
-            except:
-                Color["a"] = 1
-        except:
-            Color = DefaultColor
-        return Color
+# Imports the font faces a plan needs and hands out one SlateFontInfo per font and size, shared by every text widget using it
+class FontRegistry():
+    def __init__(self, Profiler):
+        self.Profiler = Profiler
+        self.FontObjects = {}
+        self.Fonts = {}
 
-# Helper function to save assets
-def saveAsset(Asset):
-    unreal.EditorAssetLibrary.save_loaded_asset(Asset, only_if_is_dirty=False)
+    # Import every new font face with a single import call, then create the font asset text widgets use for each face
+    def importFonts(self, FontImports, ProjectDirectory, createDirectory):
+        if not FontImports:
+            return
+        ImportTasks = []
+        for FontImport in FontImports:
+            createDirectory(FontImport["Directory"])
+            AssetImportTask = unreal.AssetImportTask()
+            AssetImportTask.set_editor_property('filename', ProjectDirectory + FontImport["RawPath"])
+            AssetImportTask.set_editor_property('destination_path', FontImport["Directory"])
+            AssetImportTask.set_editor_property('replace_existing', True)
+            AssetImportTask.set_editor_property('automated', True) # Don't ask whether to create a font asset as well, it is created below
+            AssetImportTask.set_editor_property('save', True)
+            ImportTasks.append(AssetImportTask)
+        unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(ImportTasks)
+        FontAssets = []
+        for FontImport in FontImports:
+            FontFace = unreal.EditorAssetLibrary.load_asset(FontImport["FaceAssetPath"])
+            if FontFace is None:
+                print("Unable to import font: " + FontImport["RawPath"])
+                continue
+            if unreal.EditorAssetLibrary.does_asset_exist(FontImport["AssetPath"]):
+                Font = unreal.EditorAssetLibrary.load_asset(FontImport["AssetPath"])
+            else:
+                Font = unreal.AssetToolsHelpers.get_asset_tools().create_asset(FontImport["AssetPath"].split("/")[-1], FontImport["Directory"], unreal.Font, unreal.FontFactory())
+            unreal.FigmaImporterBPLibrary.set_font_face(Font, FontFace, FontImport["TypefaceName"])
+            FontAssets.append(Font)
+        if FontAssets:
+            saveAssets(FontAssets, self.Profiler)
+        self.Profiler.count("FontsImported", len(FontAssets))
+        print("Imported " + str(len(FontAssets)) + " fonts")
 
-# Figma API uses absolute positions, we want relative positions
-def createRelativePosition(ParentPosition, ChildPosition):
-    RelativePosition = [ChildPosition[0]-ParentPosition[0],ChildPosition[1]-ParentPosition[1]]
-    return RelativePosition
+    # Loads a font asset once per import, falling back to the plugin's Inter font if it is missing
+    def loadFontObject(self, AssetPath, TypefaceName):
+        if AssetPath not in self.FontObjects:
+            FontObject = unreal.EditorAssetLibrary.load_asset(AssetPath)
+            self.Profiler.count("LoadAssetCalls")
+            if FontObject is None and AssetPath != DefaultFontPath:
+                print("Unable to load font " + AssetPath + ", using Inter instead")
+                self.FontObjects[AssetPath] = self.loadFontObject(DefaultFontPath, DefaultTypefaceName)
+            else:
+                self.FontObjects[AssetPath] = (FontObject, TypefaceName)
+        return self.FontObjects[AssetPath]
 
-# Function to create a new frame asset from the template file
-def createFigmaFrameAsset(AssetPath):
-        if unreal.EditorAssetLibrary.does_asset_exist(AssetPath):
-            return unreal.EditorAssetLibrary.load_asset(AssetPath)
-        else:
-            FrameAsset = unreal.EditorAssetLibrary.duplicate_asset("/FigmaImporter/WBP_FigmaFrame",AssetPath)
-            unreal.EditorAssetLibrary.save_loaded_asset(FrameAsset)
-            return FrameAsset
+    # Gets the font for a text widget, creating it the first time a face and size is used
+    def getFont(self, FontDict):
+        Key = (FontDict.get("AssetPath", DefaultFontPath), FontDict["Size"])
+        if Key not in self.Fonts:
+            FontObject, TypefaceName = self.loadFontObject(Key[0], FontDict.get("TypefaceName", DefaultTypefaceName))
+            Font = unreal.SlateFontInfo()
+            Font.set_editor_property('size', FontDict["Size"])
+            Font.set_editor_property('FontObject', FontObject)
+            Font.set_editor_property('TypefaceFontName', TypefaceName)
+            self.Fonts[Key] = Font
+            self.Profiler.count("FontInfos")
+        return self.Fonts[Key]
 
-# Function to run through all the children of a frame and create assets for them recursively
-def createChildren(ChildrenDict, Document, Parent):
-        Children = []
-        # Create a progress bar
-        TotalFrames = len(ChildrenDict)
-        DialogLabel = "Creating Children for: " + Parent.Name
-        with unreal.ScopedSlowTask(TotalFrames, DialogLabel) as slow_task:
-            slow_task.make_dialog(True) #Show Progress bar             
-            
-            # Loop through all children and check the asset type        
-            for child in ChildrenDict:
-                if child["type"] == "FRAME":
-                    ChildNode = FigmaFrame(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "GROUP":
-                    ChildNode = FigmaFrame(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "COMPONENT_SET":
-                    ChildNode = FigmaComponent(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "COMPONENT":
-                    ChildNode = FigmaComponent(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "INSTANCE":
-                    ChildNode = FigmaInstance(Document,child, Parent)
-                    Document.ComponentInstances.append(ChildNode)
-                    Children.append(ChildNode )
-                elif child["type"] == "VECTOR":
-                    ChildNode = FigmaVector(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "LINE":
-                    ChildNode = FigmaVector(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "BOOLEAN_OPERATION":
-                    ChildNode = FigmaVector(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "ELLIPSE":
-                    ChildNode = FigmaVector(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "REGULAR_POLYGON":
-                    ChildNode = FigmaVector(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "STAR":
-                    ChildNode = FigmaVector(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "RECTANGLE":
-                    ChildNode = FigmaVector(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode )
-                elif child["type"] == "TEXT": 
-                    ChildNode = FigmaText(Document,child, Parent)
-                    ChildNode.writeToUnreal()
-                    Children.append(ChildNode ) 
-                if slow_task.should_cancel():         # True if the user has pressed Cancel in the UI
-                            break
-                slow_task.enter_progress_frame(1)     # Advance progress by one frame.
-        return Children
+# Adds every widget planned for a blueprint with a single call to the importer library
+def buildWidgets(FrameAsset, Specs, Profiler):
+    if Specs:
+        with Profiler.phase("buildWidgets"):
+            unreal.FigmaImporterBPLibrary.build_widgets(FrameAsset, Specs)
+        Profiler.count("WidgetSpecs", len(Specs))
 
-# Top level parent for a Figma document
-class FigmaDocument():
-    def __init__(self, FileID, BaseDirectory, AccessToken, Pages = [-1]):
-        self.FileID = FileID
-        self.BaseDirectory = BaseDirectory
-        self.AccessToken = AccessToken
-        self.Components = {}
-        self.ComponentInstances = []
-        self.Pages= Pages
-        self.readFile()
-
-    # Read in file from API    
-    def readFile(self):
-        FileResponse=requests.get("https://api.figma.com/v1/files/" + self.FileID, headers={"X-Figma-Token": self.AccessToken})
-        self.File = json.loads(FileResponse.text)
-        self.Name = sanitiseName(self.File["name"])
-        self.Directory = self.BaseDirectory + self.Name +"/"
-        self.Canvases = []
-        for i, CanvasContent in enumerate(self.File["document"]["children"]):
-            if i in self.Pages or self.Pages[0] == -1: 
-                self.Canvases.append(FigmaCanvas(CanvasContent, self)) 
-        
-        
+# Orders blueprints so each one comes after every blueprint it places, including components on later canvases, otherwise keeping plan order
+# Blueprints are keyed by id as same-named siblings share an asset path, a dependency on a shared path waits for every blueprint with it
+def sortBlueprints(Blueprints):
+    BlueprintsByPath = {}
+    for Blueprint in Blueprints:
+        BlueprintsByPath.setdefault(Blueprint["AssetPath"], []).append(Blueprint)
+    SortedBlueprints = []
+    Visited = set()
+    def visit(Blueprint):
+        if Blueprint["id"] in Visited:
+            return
+        Visited.add(Blueprint["id"])
+        for Path in Blueprint["Dependencies"]:
+            for Dependency in BlueprintsByPath.get(Path, []):
+                visit(Dependency)
+        SortedBlueprints.append(Blueprint)
+    for Blueprint in Blueprints:
+        visit(Blueprint)
+    return SortedBlueprints
 
-    # Produce assets from file in Unreal
-    def writeToUnreal(self):
-        createDirSafe(self.Directory)
-        for Canvas in self.Canvases:
-            createDirSafe(Canvas.Directory)
-            AssetName = "WBP_" + Canvas.Name
-            Canvas.FrameAsset = createFigmaFrameAsset(Canvas.Directory+AssetName) # Create new frame asset to use
-
-            unreal.FigmaImporterBPLibrary.clear_content(Canvas.FrameAsset) # Clear any existing content from content tree (does not delete blueprint code but may break references)
-            unreal.FigmaImporterBPLibrary.set_background(Canvas.FrameAsset, [10000,10000], [Canvas.BackgroundColor["r"],Canvas.BackgroundColor["g"],Canvas.BackgroundColor["b"],Canvas.BackgroundColor["a"]]) # Canvas Background set to arbitrary size of 10000x10000px
-            Canvas.Children = createChildren(Canvas.ChildrenDict, self, Canvas) # Recursively creates child assets
-            for Instance in self.ComponentInstances:
-                Instance.writeToUnreal()
-            saveAsset(Canvas.FrameAsset)
+# Helper function to save assets
+def saveAssets(Assets, Profiler=None):
+    unreal.EditorAssetLibrary.save_loaded_assets(Assets, only_if_is_dirty=False)
+    if Profiler:
+        Profiler.count("SaveCalls")
+        Profiler.count("AssetsSaved", len(Assets))
 
-    # Add a component to the document that can be instanced
-    def addComponent(self,Component):
-        self.Components[Component.id] = Component
+# Collects the blueprints modified during an import so each one is saved exactly once at the end
+class SaveScheduler():
+    def __init__(self, Profiler = None):
+        self.Profiler = Profiler
+        self.Assets = {}
+        self.Dependencies = {}
 
+    # Mark an asset as needing a save, along with any other dirty assets it references that must be saved first
+    def markDirty(self, Asset, Dependencies = []):
+        Path = Asset.get_path_name()
+        self.Assets[Path] = Asset
+        self.Dependencies.setdefault(Path, set()).update(Dependency.get_path_name() for Dependency in Dependencies)
 
-class FigmaCanvas():
-    def __init__(self,CanvasContent, Document):
-        self.Document = Document
-        self.CanvasContent = CanvasContent
-        self.Name = sanitiseName(self.CanvasContent["name"])
-        try: # May not have a background colour
-                    self.BackgroundColor = {
-                                    "r" : self.CanvasContent["backgroundColor"]["r"],
-                                    "g" : self.CanvasContent["backgroundColor"]["g"],
-                                    "b" : self.CanvasContent["backgroundColor"]["b"],
-                                    "a" : self.CanvasContent["backgroundColor"]["a"]
-                                    }
-        except KeyError:
-                    self.BackgroundColor = {
-                                    "r" : 0.5,
-                                    "g" : 0.5,
-                                    "b" : 0.5,
-                                    "a" : 1
-                                    }
-        self.ChildrenDict = self.CanvasContent["children"]
-        self.xPosition = 0
-        self.yPosition = 0
-        self.Directory = self.Document.Directory+self.Name+"/"
+    # Save every dirty asset with one bulk save per dependency level, so children are saved before the parents that reference them
+    def flush(self):
+        Levels = {}
+        def getLevel(Path, Visiting):
+            if Path not in Levels:
+                Visiting.add(Path)
+                DependencyLevels = [getLevel(Dependency, Visiting) for Dependency in self.Dependencies.get(Path, []) if Dependency in self.Assets and Dependency not in Visiting]
+                Visiting.discard(Path)
+                Levels[Path] = max(DependencyLevels) + 1 if DependencyLevels else 0
+            return Levels[Path]
+        for Path in self.Assets:
+            getLevel(Path, set())
+        for Level in sorted(set(Levels.values())):
+            saveAssets([self.Assets[Path] for Path in self.Assets if Levels[Path] == Level], self.Profiler)
+        self.Assets = {}
+        self.Dependencies = {}
 
-# Standard Figma frame holds children
-class FigmaFrame():
-    def __init__(self, Document, FrameDict, Parent):
-        self.Document = Document
-        self.Parent = Parent
-        self.Name = sanitiseName(FrameDict["name"])
-        self.Directory = self.Parent.Directory +  self.Name + "/"
-        self.Height = FrameDict["absoluteBoundingBox"]["height"]
-        self.Width = FrameDict["absoluteBoundingBox"]["width"]
-        self.xPosition = FrameDict["absoluteBoundingBox"]["x"]
-        self.yPosition = FrameDict["absoluteBoundingBox"]["y"]
-        self.id = FrameDict["id"]
-        if type(self.Parent) == FigmaCanvas: # Check if parent is the canvas and set anchors accordingly
-            self.MinAnchors = [0.5,0.5]
-            self.MaxAnchors = [0.5,0.5]
-            self.Alignment = [0,0]
+# Function to create a new frame asset from the template file, new assets are left for the SaveScheduler to save once they are built
+def createFigmaFrameAsset(AssetPath, Profiler=None):
+        if unreal.EditorAssetLibrary.does_asset_exist(AssetPath):
+            if Profiler:
+                Profiler.count("LoadAssetCalls")
+            return unreal.EditorAssetLibrary.load_asset(AssetPath)
         else:
-            self.MinAnchors = [0,0]
-            self.MaxAnchors = [0,0]
-            self.Alignment = [0,0] 
-
-        self.ChildrenDict = FrameDict["children"]
-        
-        self.BackgroundColor = getColorFromFills(FrameDict["fills"],{
-                                    "r" : 0,
-                                    "g" : 0,
-                                    "b" : 0,
-                                    "a" : 0
-                                    })
-            
-        
-    # Produce assets from frame in Unreal and add to parent frame
-    def writeToUnreal(self):
-        
-        createDirSafe(self.Directory)
-        
-        self.AssetName = "WBP_" + self.Name
-        
-        self.FrameAsset = createFigmaFrameAsset(self.Directory+"/"+ self.AssetName)
-
-        unreal.FigmaImporterBPLibrary.clear_content(self.FrameAsset)
-        unreal.FigmaImporterBPLibrary.set_background(self.FrameAsset, [self.Width,self.Height], [self.BackgroundColor["r"],self.BackgroundColor["g"],self.BackgroundColor["b"],self.BackgroundColor["a"]])
-        self.Children = createChildren(self.ChildrenDict, self.Document, self)
-        saveAsset(self.FrameAsset)
-        unreal.FigmaImporterBPLibrary.add_child_widget(self.Parent.FrameAsset,getAssetPath(self.Directory, self.AssetName) , createInsatanceName(self.Name, self.id), [self.Width,self.Height], createRelativePosition([self.Parent.xPosition, self.Parent.yPosition], [self.xPosition, self.yPosition]), self.Alignment, self.MinAnchors, self.MaxAnchors)
-        saveAsset(self.Parent.FrameAsset)
+            FrameAsset = unreal.EditorAssetLibrary.duplicate_asset("/FigmaImporter/WBP_FigmaFrame",AssetPath)
+            if Profiler:
+                Profiler.count("AssetsCreated")
+            return FrameAsset
 
-# Special frame class that can be instanced
-class FigmaComponent(FigmaFrame):
-    # Produce assets from frame in Unreal and add to parent frame
-    def writeToUnreal(self):
-        
-        createDirSafe(self.Directory)
-        
-        self.AssetName = "WBP_" + self.Name
-        
-        self.FrameAsset = createFigmaFrameAsset(self.Directory+"/"+ self.AssetName)
+# Applies a plan in Unreal, every blueprint asset is created before any are built so instances can always find their component
+class PlanExecutor():
+    def __init__(self, Plan, ImportProfiler = None):
+        if Plan.get("Version") != PlanVersion:
+            raise ValueError("Plan was made by a different version of the importer, plan the import again")
+        self.Plan = Plan
+        self.ProjectDirectory = os.path.join(unreal.Paths.project_dir(), "")
+        self.Profiler = ImportProfiler if ImportProfiler is not None else Profiler()
+        self.SaveScheduler = SaveScheduler(self.Profiler)
+        self.Fonts = FontRegistry(self.Profiler)
+        self.Directories = set()
+        self.FrameAssets = {}
+        self.ImportedTextures = set()
+        self.BuiltIDs = set()
+        self.Cancelled = False
 
-        unreal.FigmaImporterBPLibrary.clear_content(self.FrameAsset)
-        unreal.FigmaImporterBPLibrary.set_background(self.FrameAsset, [self.Width,self.Height], [self.BackgroundColor["r"],self.BackgroundColor["g"],self.BackgroundColor["b"],self.BackgroundColor["a"]])
-        self.Children = createChildren(self.ChildrenDict, self.Document, self)
-        saveAsset(self.FrameAsset)
-        unreal.FigmaImporterBPLibrary.add_child_widget(self.Parent.FrameAsset,getAssetPath(self.Directory, self.AssetName) , createInsatanceName(self.Name, self.id), [self.Width,self.Height], createRelativePosition([self.Parent.xPosition, self.Parent.yPosition], [self.xPosition, self.yPosition]), self.Alignment, self.MinAnchors, self.MaxAnchors)
-        saveAsset(self.Parent.FrameAsset)
-        self.Document.addComponent(self)
+    # Make an Unreal directory once per import
+    def createDirectory(self, Directory):
+        if Directory not in self.Directories:
+            createDirSafe(Directory)
+            self.Directories.add(Directory)
 
-# An instance that references an existing component
-class FigmaInstance():
-    def __init__(self, Document, FrameDict, Parent):
-        self.Document = Document
-        self.Parent = Parent
-        self.Name = sanitiseName(FrameDict["name"])
-        self.Directory = self.Parent.Directory +  self.Name + "/"
-        self.Height = FrameDict["absoluteBoundingBox"]["height"]
-        self.Width = FrameDict["absoluteBoundingBox"]["width"]
-        self.xPosition = FrameDict["absoluteBoundingBox"]["x"]
-        self.yPosition = FrameDict["absoluteBoundingBox"]["y"]
-        self.id = FrameDict["id"]
-        self.ComponentID = FrameDict["componentId"]
-        if type(self.Parent) == FigmaCanvas: # Check if parent is the canvas and set anchors accordingly
-            self.MinAnchors = [0.5,0.5]
-            self.MaxAnchors = [0.5,0.5]
-            self.Alignment = [0,0]
-        else:
-            self.MinAnchors = [0,0]
-            self.MaxAnchors = [0,0]
-            self.Alignment = [0,0] 
+    # Create or load the asset of every blueprint being rebuilt
+    def createAssets(self):
+        for Blueprint in self.Plan["Blueprints"]:
+            self.createDirectory(Blueprint["Directory"])
+            self.FrameAssets[Blueprint["AssetPath"]] = createFigmaFrameAsset(Blueprint["AssetPath"], self.Profiler)
 
-        self.ChildrenDict = FrameDict["children"]
-        
-        self.BackgroundColor = getColorFromFills(FrameDict["fills"],{
-                                    "r" : 0,
-                                    "g" : 0,
-                                    "b" : 0,
-                                    "a" : 0
-                                    })
-            
-        
-    # Produce assets from frame in Unreal and add to parent frame
-    def writeToUnreal(self):
-        try: # Try finding source component in document
-            InstanceSource = self.Document.Components[self.ComponentID]
-            InstanceSourceDirectory = InstanceSource.Directory
-            InstanceSourceAssetName = InstanceSource.AssetName
-            unreal.FigmaImporterBPLibrary.add_child_widget(self.Parent.FrameAsset,getAssetPath(InstanceSourceDirectory, InstanceSourceAssetName) , createInsatanceName(self.Name, self.id), [self.Width,self.Height], createRelativePosition([self.Parent.xPosition, self.Parent.yPosition], [self.xPosition, self.yPosition]), self.Alignment, self.MinAnchors, self.MaxAnchors)
-            saveAsset(self.Parent.FrameAsset)
-        except KeyError:
-            print("Unable to find source component")
+    # Import every planned texture using a few batched import tasks rather than one import per image
+    def importImages(self):
+        ImportTasks = []
+        for Texture in self.Plan["Textures"]:
+            self.createDirectory(Texture["Directory"])
+            AssetImportTask = unreal.AssetImportTask()
+            AssetImportTask.set_editor_property('filename', self.ProjectDirectory + Texture["RawPath"])
+            AssetImportTask.set_editor_property('destination_path', Texture["Directory"])
+            AssetImportTask.set_editor_property('replace_existing', True)
+            AssetImportTask.set_editor_property('replace_existing_settings', True)
+            AssetImportTask.set_editor_property('automated', True) # Don't show a dialog for every texture being replaced
+            AssetImportTask.set_editor_property('save', True)
+            ImportTasks.append((AssetImportTask, Texture["AssetPath"]))
+        Batches = [ImportTasks[i:i+ImportBatchSize] for i in range(0, len(ImportTasks), ImportBatchSize)]
+        AssetTools = unreal.AssetToolsHelpers.get_asset_tools()
+        TotalTime = 0
+        with unreal.ScopedSlowTask(len(Batches), "Importing images for: " + self.Plan["Name"]) as slow_task:
+            slow_task.make_dialog(True)
+            for BatchNumber, Batch in enumerate(Batches):
+                StartTime = time.perf_counter()
+                with self.Profiler.phase("importAssetTasks"):
+                    AssetTools.import_asset_tasks([AssetImportTask for AssetImportTask, ImagePath in Batch])
+                BatchTime = time.perf_counter() - StartTime
+                self.Profiler.count("TexturesImported", len(Batch))
+                TotalTime += BatchTime
+                print("Imported batch " + str(BatchNumber + 1) + "/" + str(len(Batches)) + " of " + str(len(Batch)) + " textures in " + "{:.2f}".format(BatchTime) + "s")
+                for AssetImportTask, ImagePath in Batch:
+                    if AssetImportTask.get_editor_property('imported_object_paths'):
+                        self.ImportedTextures.add(ImagePath)
+                    else:
+                        print("Unable to import image: " + ImagePath)
+                if slow_task.should_cancel():
+                    self.Cancelled = True
+                    break
+                slow_task.enter_progress_frame(1)
+        if Batches:
+            print("Imported " + str(len(ImportTasks)) + " textures in " + "{:.2f}".format(TotalTime) + "s")
 
-# A vector is the base class for all shapes and images in Figma
-class FigmaVector():
-    def __init__(self, Document, VectorDict, Parent):
-        self.Document = Document
-        self.Name = sanitiseName(VectorDict["name"])
-        self.Height = VectorDict["absoluteBoundingBox"]["height"]
-        self.Width = VectorDict["absoluteBoundingBox"]["width"]
-        self.xPosition = VectorDict["absoluteBoundingBox"]["x"]
-        self.yPosition = VectorDict["absoluteBoundingBox"]["y"]
-        self.id = VectorDict["id"]
-        self.MinAnchors = [0,0]
-        self.MaxAnchors = [0,0]
-        self.Alignment = [0,0]
-        self.Parent = Parent
+    # Add the images whose textures were imported to the image cache and write the index of every atlas whose pages were all imported
+    # Images in an atlas with a page that failed to import are left out, so the next plan packs and imports them again
+    def saveImageCache(self):
+        FailedAtlases = {Texture["Atlas"] for Texture in self.Plan["Textures"] if "Atlas" in Texture and Texture["AssetPath"] not in self.ImportedTextures}
+        Cache = figmaPlanner.ImageCache(self.ProjectDirectory + self.Plan["ImageCache"]["Path"], self.ProjectDirectory, self.Plan["ImageCache"]["MaxBytes"])
+        Cache.touch(self.Plan["ImageCache"]["Reused"])
+        for Texture in self.Plan["Textures"]:
+            if Texture["AssetPath"] in self.ImportedTextures and Texture.get("Atlas") not in FailedAtlases:
+                for Image in Texture["Images"]:
+                    Cache.add(**Image)
+        for AtlasIndex, Atlas in enumerate(self.Plan["Atlases"]):
+            if AtlasIndex not in FailedAtlases:
+                figmaPlanner.saveAtlasIndex(self.ProjectDirectory + Atlas["IndexPath"], Atlas["Pages"])
+        Cache.evict()
+        Cache.save()
 
-    # Uses Figma API to download a bitmap image representation of the vector (Special vectors like rectangles should use native Unreal assets where possible but not implemented yet)
-    def downloadImage(self):
-        FileResponse=requests.get("https://api.figma.com/v1/images/" + self.Document.FileID + "?ids=" + self.id, headers={"X-Figma-Token": self.Document.AccessToken})
-        File = json.loads(FileResponse.text)
-        ImageURL = File["images"][self.id]
-        ImageData = requests.get(ImageURL).content
-        
-        self.RawImageDirectory = unreal.Paths.project_dir() + "RawAssets" + self.Parent.Directory
-        if not os.path.exists(self.RawImageDirectory):
-            os.makedirs(self.RawImageDirectory)
-        self.ImageName = "T_" + self.Name
-        self.RawImageName = self.ImageName + ".png"
-        self.RawImagePath = self.RawImageDirectory + self.RawImageName
-        self.ImageDirectory = self.Parent.Directory +"Images/"
-        createDirSafe(self.ImageDirectory)
-        self.ImagePath = os.path.splitext(self.ImageDirectory + self.RawImageName)[0]
-        with open(self.RawImagePath, 'wb') as handler:
-            handler.write(ImageData)
+    # Build every blueprint after the blueprints it places, so instances are always built against their rebuilt component
+    def buildBlueprints(self):
+        with unreal.ScopedSlowTask(len(self.Plan["Blueprints"]), "Building widgets for: " + self.Plan["Name"]) as slow_task:
+            slow_task.make_dialog(True)
+            for Blueprint in sortBlueprints(self.Plan["Blueprints"]):
+                if self.Cancelled or slow_task.should_cancel(): # True if the user has pressed Cancel in the UI
+                    self.Cancelled = True
+                    break
+                self.Profiler.startNode("BLUEPRINT")
+                FrameAsset = self.FrameAssets[Blueprint["AssetPath"]]
+                unreal.FigmaImporterBPLibrary.clear_content(FrameAsset) # Clear any existing content from content tree (does not delete blueprint code but may break references)
+                unreal.FigmaImporterBPLibrary.set_background(FrameAsset, Blueprint["Size"], Blueprint["BackgroundColor"])
+                buildWidgets(FrameAsset, [createWidgetSpec(SpecDict, self.Fonts) for SpecDict in Blueprint["Widgets"]], self.Profiler)
+                self.SaveScheduler.markDirty(FrameAsset, [self.FrameAssets[Path] for Path in Blueprint["Dependencies"]])
+                self.BuiltIDs.add(Blueprint["id"])
+                self.Profiler.stopNode(Blueprint["AssetPath"].split("/")[-1])
+                slow_task.enter_progress_frame(1)
 
-    # Produce assets and add to parent frame
-    def writeToUnreal(self):
-        self.downloadImage()
-        AssetTools = unreal.AssetToolsHelpers.get_asset_tools()
-        AssetImportTask = unreal.AssetImportTask()
-        AssetImportTask.set_editor_property('filename', self.RawImagePath)
-        AssetImportTask.set_editor_property('destination_path', self.ImageDirectory)
-        AssetImportTask.set_editor_property('replace_existing', True)
-        AssetImportTask.set_editor_property('replace_existing_settings', True)
-        AssetImportTask.set_editor_property('save', True)
-        AssetTools.import_asset_tasks([AssetImportTask])
-        ImageTexture2D = unreal.EditorAssetLibrary.load_asset(self.ImagePath)
-        self.Widget = unreal.FigmaImporterBPLibrary.add_image_widget(self.Parent.FrameAsset,
-                                                                     createInsatanceName(self.Name, self.id),
-                                                                     [ImageTexture2D.blueprint_get_size_x(),ImageTexture2D.blueprint_get_size_y()], # Use the image size rather than stated size to enable LINE to work which reports 0 width
-                                                                     createRelativePosition([self.Parent.xPosition, self.Parent.yPosition],
-                                                                     [self.xPosition, self.yPosition]),
-                                                                    self.ImagePath, self.Alignment, self.MinAnchors, self.MaxAnchors)
-        saveAsset(self.Parent.FrameAsset)
+    # Write the manifest, leaving out blueprints that weren't built so they are rebuilt on the next import
+    def saveManifest(self):
+        Manifest = self.Plan["Manifest"]
+        for Blueprint in self.Plan["Blueprints"]:
+            if Blueprint["id"] not in self.BuiltIDs:
+                Manifest["Blueprints"].pop(Blueprint["id"], None)
+        ManifestPath = self.ProjectDirectory + self.Plan["ManifestPath"]
+        if not os.path.exists(os.path.dirname(ManifestPath)):
+            os.makedirs(os.path.dirname(ManifestPath))
+        with open(ManifestPath + ".part", 'w') as handler:
+            json.dump(Manifest, handler)
+        os.replace(ManifestPath + ".part", ManifestPath)
 
-# Text class (need to add better font support, currently uses default Inter font)
-class FigmaText():
-    def __init__(self, Document, TextDict, Parent):
-        self.Document = Document
-        self.Name = sanitiseName(TextDict["name"])
-        self.Height = TextDict["absoluteBoundingBox"]["height"]
-        self.Width = TextDict["absoluteBoundingBox"]["width"]
-        self.xPosition = TextDict["absoluteBoundingBox"]["x"]
-        self.yPosition = TextDict["absoluteBoundingBox"]["y"]
-        self.id = TextDict["id"]
-        self.Parent = Parent
-        self.Content = TextDict["characters"]
-        self.FontSize = TextDict["style"]["fontSize"]
-        self.FontColor = getColorFromFills(TextDict["fills"],{
-                                "r" : 0,
-                                "g" : 0,
-                                "b" : 0,
-                                "a" : 1,
-                             })
-
-        self.FontFamily = TextDict["style"]["fontFamily"]
-        self.MinAnchors = [0,0]
-        self.MaxAnchors = [0,0]
-        self.Alignment = [0,0]
+    # Produce assets from the plan in Unreal
+    def execute(self):
+        unreal.FigmaImporterBPLibrary.reset_stats()
+        self.createDirectory(self.Plan["Directory"])
+        with self.Profiler.phase("createAssets"):
+            self.createAssets()
+        with self.Profiler.phase("importImages"):
+            self.importImages()
+        with self.Profiler.phase("saveImageCache"):
+            self.saveImageCache()
+        with self.Profiler.phase("importFonts"):
+            self.Fonts.importFonts(self.Plan["Fonts"], self.ProjectDirectory, self.createDirectory)
+        with self.Profiler.phase("build"):
+            self.buildBlueprints()
+        with self.Profiler.phase("save"):
+            self.SaveScheduler.flush()
+        with self.Profiler.phase("finish"):
+            self.saveManifest()
+        readLibraryStats(self.Profiler)
+        self.Profiler.save(self.ProjectDirectory + getRawImageDirectory(self.Plan["Directory"]))
 
+# Plans and executes an import in one go from inside Unreal
+class FigmaDocument():
+    def __init__(self, FileID, BaseDirectory, AccessToken, Pages = [-1], DownloadWorkers = DownloadWorkers, MaxRawAssetBytes = MaxRawAssetBytes, AtlasImages = False, Session = None, FontDirectory = None):
+        self.Profiler = Profiler()
+        self.Planner = figmaPlanner.FigmaPlanner(FileID, BaseDirectory, AccessToken, unreal.Paths.project_dir(), Pages, DownloadWorkers, MaxRawAssetBytes, AtlasImages, Session, unreal.EditorAssetLibrary.does_asset_exist, self.Profiler, FontDirectory)
+        self.Name = self.Planner.Name
+        self.Directory = self.Planner.Directory
 
-    # Adds text to parent frame
+    # Produce assets from file in Unreal
     def writeToUnreal(self):
-        Font = unreal.SlateFontInfo()
-        Font.set_editor_property('size', self.FontSize)
-        Font.set_editor_property('FontObject',unreal.EditorAssetLibrary.load_asset("/FigmaImporter/Inter-VariableFont_slnt_wght_Font")) # Uses default Inter font from plugin
-        Font.set_editor_property('TypefaceFontName', "Inter-VariableFont_slnt_wght")
-        self.Widget = unreal.FigmaImporterBPLibrary.add_text_widget(self.Parent.FrameAsset, createInsatanceName(self.Name, self.id), self.Content, Font, [self.Width,self.Height], createRelativePosition([self.Parent.xPosition, self.Parent.yPosition], [self.xPosition, self.yPosition]), self.Alignment, self.MinAnchors, self.MaxAnchors)
-        self.Widget.set_editor_property('color_and_opacity', unreal.SlateColor([self.FontColor["r"],self.FontColor["g"],self.FontColor["b"],self.FontColor["a"]]))
-        saveAsset(self.Parent.FrameAsset)
\ No newline at end of file
+        PlanExecutor(self.Planner.createPlan(), self.Profiler).execute()
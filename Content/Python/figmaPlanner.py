@@ -0,0 +1,1277 @@
+# First stage of an import that runs without Unreal, so it can run on a build machine or alongside the editor
+# Fetches and parses the file, downloads and packs images, and writes a plan of everything figmaApi needs to do in the editor
+# Usage: python figmaPlanner.py <FileID> <AccessToken> <ProjectDirectory> <PlanPath> [--base-directory /Game/Figma/] [--pages 0 2]
+# then run runExecuteFigmaPlan.py in the editor with the same plan
+
+import requests
+import json
+import argparse
+import os
+import time
+import hashlib
+import struct
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+try: # Pillow is only needed to pack images into atlases
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+try: # ijson is only needed to stream large files, otherwise the whole file is loaded at once
+    import ijson
+except ImportError:
+    ijson = None
+
+FigmaApiUrl = "https://api.figma.com/v1/"
+ContainerTypes = ["FRAME", "GROUP", "COMPONENT_SET", "COMPONENT"] # Node types that become their own widget blueprint
+VectorTypes = ["VECTOR", "LINE", "BOOLEAN_OPERATION", "ELLIPSE", "REGULAR_POLYGON", "STAR", "RECTANGLE"] # Node types rendered to an image
+NativeShapeTypes = ["RECTANGLE", "ELLIPSE", "LINE"] # Vector types that can be drawn natively instead when their styling is simple enough
+ImageBatchSize = 100 # Max number of node ids in a single render request
+ImageBatchMaxLength = 2000 # Max length of the ids parameter to keep request URLs well within server limits
+MaxRetries = 5 # Number of times to retry a request that was rate limited or hit a server error
+DownloadWorkers = 8 # Default number of images downloaded at once
+DownloadChunkSize = 64 * 1024 # Size of chunks streamed to disk when downloading images
+AtlasMaxImageSize = 128 # Only images with both sides this size or smaller are packed into atlases
+AtlasSize = 1024 # Width and height of each atlas page, fixed so existing images never move when more are added
+AtlasPadding = 2 # Transparent pixels left between images in an atlas to avoid bleeding
+MaxRawAssetBytes = 1024 * 1024 * 1024 # Default size cap for downloaded images kept in the RawAssets directory for each imported file
+ManifestVersion = 5 # Increase whenever the way blueprints are built changes so that every blueprint is rebuilt on the next import
+GoogleFontsUrl = "https://fonts.googleapis.com/css2" # Font files missing locally are fetched from Google Fonts
+FontExtensions = [".ttf", ".otf"] # Font files that can be imported as font faces
+AccessTokenVariable = "FIGMA_ACCESS_TOKEN" # Environment variable the token is read from when - is given on the command line
+PlanVersion = 3 # Increase whenever the layout of the plan changes so an executor never applies a plan it doesn't understand
+
+# Creates a session with a connection pool large enough for every download worker to keep its connection alive
+def createSession(Workers):
+    Session = requests.Session()
+    Adapter = requests.adapters.HTTPAdapter(pool_connections=Workers, pool_maxsize=Workers)
+    Session.mount("https://", Adapter)
+    Session.mount("http://", Adapter)
+    return Session
+
+# Helper function to make a GET request to the Figma API, backing off and retrying if rate limited or on server errors
+def figmaGet(Session, Url, AccessToken, Params=None, Stream=False, Profiler=None):
+    for Attempt in range(MaxRetries + 1):
+        Response = Session.get(Url, headers={"X-Figma-Token": AccessToken}, params=Params, stream=Stream)
+        if Profiler:
+            Profiler.count("ApiCalls")
+        if Response.status_code != 429 and Response.status_code < 500:
+            break
+        Response.close()
+        if Attempt < MaxRetries:
+            if Profiler:
+                Profiler.count("ApiRetries")
+            try: # Use the delay requested by the server if there is one
+                Delay = float(Response.headers["Retry-After"])
+            except (KeyError, ValueError):
+                Delay = 2 ** Attempt
+            print("Figma API returned " + str(Response.status_code) + ", retrying in " + str(Delay) + "s")
+            time.sleep(Delay)
+    Response.raise_for_status()
+    return Response
+
+# Parses a file response as it downloads rather than loading the whole response first
+# Only the pages and the top level fields other than the document are built, one page at a time
+def parseFileStream(Response):
+    File = {"document" : {"children" : []}}
+    CanvasPrefix = "document.children.item"
+    Key = None
+    Builder = None
+    BuilderPrefix = None
+    Response.raw.decode_content = True
+    for Prefix, Event, Value in ijson.parse(Response.raw, use_float=True):
+        if Builder is not None: # Building a value until the end of the map or array it started with
+            Builder.event(Event, Value)
+            if Prefix == BuilderPrefix and Event in ["end_map", "end_array"]:
+                if BuilderPrefix == CanvasPrefix:
+                    File["document"]["children"].append(Builder.value)
+                else:
+                    File[Key] = Builder.value
+                Builder = None
+        elif Prefix == CanvasPrefix and Event == "start_map":
+            Builder = ijson.ObjectBuilder()
+            Builder.event(Event, Value)
+            BuilderPrefix = Prefix
+        elif Prefix == "" and Event == "map_key":
+            Key = Value
+        elif Prefix == Key and Key != "document": # Top level value
+            if Event in ["start_map", "start_array"]:
+                Builder = ijson.ObjectBuilder()
+                Builder.event(Event, Value)
+                BuilderPrefix = Prefix
+            else:
+                File[Key] = Value
+    return File
+
+# Streams a file to disk, writing to a temporary file first so a failed download never leaves a partial image behind
+def downloadFile(Session, Url, Path, Profiler=None):
+    TempPath = Path + ".part"
+    Bytes = 0
+    with Session.get(Url, stream=True) as Response:
+        Response.raise_for_status()
+        with open(TempPath, 'wb') as handler:
+            for Chunk in Response.iter_content(chunk_size=DownloadChunkSize):
+                handler.write(Chunk)
+                Bytes += len(Chunk)
+    os.replace(TempPath, Path)
+    if Profiler:
+        Profiler.count("Downloads")
+        Profiler.count("BytesDownloaded", Bytes)
+
+# Gets the directory outside of the content folder that raw images for a frame are downloaded to, relative to the project folder
+def getRawImageDirectory(Directory):
+    return "RawAssets" + Directory
+
+# Reads the width and height of a PNG from its header, so image sizes are known without importing the image
+def getPNGSize(Path):
+    with open(Path, 'rb') as handler:
+        return list(struct.unpack(">II", handler.read(24)[16:24]))
+
+# Fingerprint of everything that affects how a node renders, ignoring where the node sits on the page
+def getNodeHash(NodeDict):
+    RenderDict = dict(NodeDict)
+    for BoundsKey in ["absoluteBoundingBox", "absoluteRenderBounds"]:
+        if RenderDict.get(BoundsKey):
+            RenderDict[BoundsKey] = {"width" : RenderDict[BoundsKey]["width"], "height" : RenderDict[BoundsKey]["height"]}
+    return hashlib.sha1(json.dumps(RenderDict, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+# Moves every bounding box in a node tree so that it is relative to an origin
+def getRelativeNode(NodeDict, Origin):
+    RelativeDict = dict(NodeDict)
+    for BoundsKey in ["absoluteBoundingBox", "absoluteRenderBounds"]:
+        if RelativeDict.get(BoundsKey):
+            RelativeDict[BoundsKey] = dict(RelativeDict[BoundsKey], x=RelativeDict[BoundsKey]["x"]-Origin[0], y=RelativeDict[BoundsKey]["y"]-Origin[1])
+    if "children" in RelativeDict:
+        RelativeDict["children"] = [getRelativeNode(Child, Origin) for Child in RelativeDict["children"]]
+    return RelativeDict
+
+# Fingerprint of everything that ends up inside a node's widget blueprint
+# Child blueprints and instances only contribute their placement since their content lives in their own blueprint
+# Texts contribute the font asset they resolved to, so a blueprint that fell back to Inter is rebuilt once its font is found
+def getBlueprintHash(NodeDict, Fonts):
+    try:
+        Origin = [NodeDict["absoluteBoundingBox"]["x"], NodeDict["absoluteBoundingBox"]["y"]]
+    except KeyError: # Canvases have no bounding box and children are already relative to the page
+        Origin = [0, 0]
+    BlueprintDict = {Key : Value for Key, Value in NodeDict.items() if Key not in ["children", "absoluteBoundingBox", "absoluteRenderBounds"]}
+    BlueprintDict["size"] = [NodeDict["absoluteBoundingBox"]["width"], NodeDict["absoluteBoundingBox"]["height"]] if "absoluteBoundingBox" in NodeDict else None
+    BlueprintDict["children"] = []
+    for Child in NodeDict.get("children", []):
+        if Child["type"] in ContainerTypes or Child["type"] == "INSTANCE":
+            Child = {Key : Child.get(Key) for Key in ["id", "name", "type", "componentId", "absoluteBoundingBox"]}
+        elif Child["type"] == "TEXT":
+            Child = dict(Child, fontAssetPath=Fonts.get(getFontFace(Child["style"])["Key"], {}).get("AssetPath"))
+        BlueprintDict["children"].append(getRelativeNode(Child, Origin))
+    return hashlib.sha1(json.dumps(BlueprintDict, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+# Times each phase of an import and each type of node, and counts the work done, cheap enough to leave on for every import
+# Phases and blueprints are also recorded as trace events that can be opened in chrome://tracing or ui.perfetto.dev
+class Profiler():
+    def __init__(self):
+        self.StartTime = time.perf_counter()
+        self.Phases = {}
+        self.NodeTypes = {}
+        self.Counters = {}
+        self.Library = {}
+        self.Events = []
+        self.NodeStack = []
+        self.Lock = threading.Lock() # Counters are also updated from download threads
+
+    def addEvent(self, Name, Category, Start, End):
+        self.Events.append({"name" : Name, "cat" : Category, "ph" : "X", "ts" : (Start - self.StartTime) * 1000000, "dur" : (End - Start) * 1000000, "pid" : os.getpid(), "tid" : threading.get_ident()})
+
+    @contextmanager
+    def phase(self, Name):
+        Start = time.perf_counter()
+        try:
+            yield
+        finally:
+            End = time.perf_counter()
+            Phase = self.Phases.setdefault(Name, {"Seconds" : 0, "Calls" : 0})
+            Phase["Seconds"] += End - Start
+            Phase["Calls"] += 1
+            self.addEvent(Name, "phase", Start, End)
+
+    def count(self, Name, Amount = 1):
+        with self.Lock:
+            self.Counters[Name] = self.Counters.get(Name, 0) + Amount
+
+    # Start timing a node, time spent in nodes nested inside it is left out of its own time
+    def startNode(self, Type):
+        self.NodeStack.append([Type, time.perf_counter(), 0])
+
+    # Stop timing the last node started, only nodes given a name are added to the trace to keep it small
+    def stopNode(self, Name = None):
+        Type, Start, NestedSeconds = self.NodeStack.pop()
+        End = time.perf_counter()
+        NodeType = self.NodeTypes.setdefault(Type, {"Count" : 0, "Seconds" : 0})
+        NodeType["Count"] += 1
+        NodeType["Seconds"] += End - Start - NestedSeconds
+        if self.NodeStack:
+            self.NodeStack[-1][2] += End - Start
+        if Name is not None:
+            self.addEvent(Name, Type, Start, End)
+
+    def getReport(self):
+        return {
+                    "Seconds" : time.perf_counter() - self.StartTime,
+                    "Phases" : self.Phases,
+                    "NodeTypes" : self.NodeTypes,
+                    "Counters" : dict(sorted(self.Counters.items())),
+                    "Library" : self.Library
+                }
+
+    # Write the report as JSON along with a trace of the import, and print where the time went
+    def save(self, Directory, Name = "Import"):
+        if not os.path.exists(Directory):
+            os.makedirs(Directory)
+        Report = self.getReport()
+        with open(Directory + Name + "Profile.json", 'w') as handler:
+            json.dump(Report, handler, indent=4)
+        with open(Directory + Name + "Trace.json", 'w') as handler:
+            json.dump({"traceEvents" : self.Events, "displayTimeUnit" : "ms"}, handler)
+        print(Name + " took " + "{:.2f}".format(Report["Seconds"]) + "s: " + ", ".join(PhaseName + " " + "{:.2f}".format(Phase["Seconds"]) + "s" for PhaseName, Phase in self.Phases.items()))
+        print("Profile written to " + Directory + Name + "Profile.json")
+
+# Persistent index of images already imported into Unreal, keyed by file and node id and validated against the node fingerprint
+# Each imported file has its own index next to its manifest so imports of different files never write the same index
+# The planner only reads it, entries are added and saved by the executor once their textures are imported
+# Raw paths are stored relative to the project folder so the index is shared by the planner outside and inside the editor
+# AssetExists checks that a texture is still in the project, without it textures are assumed to still exist if they are in the cache
+class ImageCache():
+    def __init__(self, Path, ProjectDirectory, MaxBytes = MaxRawAssetBytes, AssetExists = None):
+        self.Path = Path
+        self.ProjectDirectory = ProjectDirectory
+        self.MaxBytes = MaxBytes
+        self.AssetExists = AssetExists
+        try:
+            with open(self.Path, 'r') as handler:
+                self.Entries = json.load(handler)
+        except (OSError, ValueError):
+            self.Entries = {}
+
+    # Returns the cached entry if the node is unchanged and its texture asset still exists, otherwise None
+    # Images packed into an atlas are only reused if they are still in the same atlas and its raw page is still on disk
+    def find(self, Key, Hash, ImagePath, AtlasGroup = None):
+        Entry = self.Entries.get(Key)
+        if Entry is None or Entry["Hash"] != Hash:
+            return None
+        if Entry.get("AtlasGroup"):
+            if Entry["AtlasGroup"] != AtlasGroup or not os.path.exists(self.getPath(Entry["RawAtlasPath"])):
+                return None
+        elif Entry["ImagePath"] != ImagePath:
+            return None
+        if self.AssetExists and not self.AssetExists(Entry["ImagePath"]):
+            return None
+        return Entry
+
+    # Gets the absolute path of a raw image
+    def getPath(self, Path):
+        return os.path.join(self.ProjectDirectory, Path)
+
+    # Marks images reused by an import as recently used so they are the last to be evicted
+    def touch(self, Keys):
+        for Key in Keys:
+            if Key in self.Entries:
+                self.Entries[Key]["LastUsed"] = time.time()
+
+    # Records a newly imported image, along with the region of the atlas it was packed into if any
+    def add(self, Key, Hash, RawImagePath, ImagePath, Size, UVRegion = None, AtlasGroup = None, RawAtlasPath = None):
+        self.Entries[Key] = {
+                                "Hash" : Hash,
+                                "RawImagePath" : RawImagePath,
+                                "ImagePath" : ImagePath,
+                                "Size" : Size,
+                                "UVRegion" : UVRegion,
+                                "AtlasGroup" : AtlasGroup,
+                                "RawAtlasPath" : RawAtlasPath,
+                                "LastUsed" : time.time()
+                            }
+
+    # Deletes the least recently used raw images until the file's raw images are under the size cap (imported textures are kept)
+    def evict(self):
+        RawImages = []
+        TotalBytes = 0
+        for Entry in self.Entries.values():
+            if Entry["RawImagePath"] and os.path.exists(self.getPath(Entry["RawImagePath"])):
+                Bytes = os.path.getsize(self.getPath(Entry["RawImagePath"]))
+                RawImages.append((Entry["LastUsed"], Bytes, Entry))
+                TotalBytes += Bytes
+        for LastUsed, Bytes, Entry in sorted(RawImages, key=lambda RawImage: RawImage[0]):
+            if TotalBytes <= self.MaxBytes:
+                break
+            os.remove(self.getPath(Entry["RawImagePath"]))
+            Entry["RawImagePath"] = None
+            TotalBytes -= Bytes
+
+    def save(self):
+        if not os.path.exists(os.path.dirname(self.Path)):
+            os.makedirs(os.path.dirname(self.Path))
+        with open(self.Path + ".part", 'w') as handler:
+            json.dump(self.Entries, handler)
+        os.replace(self.Path + ".part", self.Path)
+
+# Pages of atlas textures that the small images of one canvas or component are packed into using a shelf packer
+# A sidecar index records where each image was placed so a reimport only repacks and reimports the pages that changed
+class TextureAtlas():
+    def __init__(self, ProjectDirectory, GroupDirectory, Name):
+        self.Name = Name
+        self.RawDirectory = ProjectDirectory + getRawImageDirectory(GroupDirectory)
+        self.Directory = GroupDirectory + "Images/"
+        self.IndexPath = self.RawDirectory + Name + ".json"
+        try:
+            with open(self.IndexPath, 'r') as handler:
+                self.Pages = json.load(handler)
+        except (OSError, ValueError):
+            self.Pages = []
+        self.DirtyPages = set()
+        self.ClearedSlots = {}
+
+    def getRawPagePath(self, PageIndex):
+        return self.RawDirectory + self.Name + "_" + str(PageIndex) + ".png"
+
+    def getPagePath(self, PageIndex):
+        return self.Directory + self.Name + "_" + str(PageIndex)
+
+    def getImageIDs(self):
+        return [id for Page in self.Pages for id in Page["Images"]]
+
+    # Gets the region of its page an image covers as fractions of the page size
+    def getUVRegion(self, PageIndex, id):
+        x, y, Width, Height = self.Pages[PageIndex]["Images"][id]["Rect"]
+        return [x/AtlasSize, y/AtlasSize, (x+Width)/AtlasSize, (y+Height)/AtlasSize]
+
+    # Frees the space used by an image so the page is cleared there when next composed
+    def remove(self, id):
+        for PageIndex, Page in enumerate(self.Pages):
+            if id in Page["Images"]:
+                self.ClearedSlots.setdefault(PageIndex, []).append(Page["Images"].pop(id)["Slot"])
+                self.DirtyPages.add(PageIndex)
+
+    # Finds space for an image, reusing its previous slot if it still fits, and returns the index of the page it was placed on
+    def place(self, id, Hash, Size):
+        for PageIndex, Page in enumerate(self.Pages):
+            Placement = Page["Images"].get(id)
+            if Placement and Size[0] + AtlasPadding <= Placement["Slot"][2] and Size[1] + AtlasPadding <= Placement["Slot"][3]:
+                Placement["Hash"] = Hash
+                Placement["Rect"] = [Placement["Slot"][0], Placement["Slot"][1], Size[0], Size[1]]
+                self.DirtyPages.add(PageIndex)
+                return PageIndex
+        self.remove(id)
+        for PageIndex, Page in enumerate(self.Pages):
+            Slot = self.allocate(Page, Size[0] + AtlasPadding, Size[1] + AtlasPadding)
+            if Slot:
+                break
+        else:
+            Page = {"Images" : {}, "Shelves" : [], "Bottom" : 0}
+            self.Pages.append(Page)
+            PageIndex = len(self.Pages) - 1
+            Slot = self.allocate(Page, Size[0] + AtlasPadding, Size[1] + AtlasPadding)
+        Page["Images"][id] = {"Hash" : Hash, "Slot" : Slot, "Rect" : [Slot[0], Slot[1], Size[0], Size[1]]}
+        self.DirtyPages.add(PageIndex)
+        return PageIndex
+
+    # Adds to the first shelf with enough room, or starts a new shelf at the bottom of the page, returns None if the page is full
+    def allocate(self, Page, Width, Height):
+        for Shelf in Page["Shelves"]: # Each shelf is [y, height, width used]
+            if Height <= Shelf[1] and Shelf[2] + Width <= AtlasSize:
+                Slot = [Shelf[2], Shelf[0], Width, Shelf[1]]
+                Shelf[2] += Width
+                return Slot
+        if Page["Bottom"] + Height <= AtlasSize:
+            Page["Shelves"].append([Page["Bottom"], Height, Width])
+            Slot = [0, Page["Bottom"], Width, Height]
+            Page["Bottom"] += Height
+            return Slot
+        return None
+
+    # Draws new and changed images into the raw page images, starting from the existing page so unchanged images don't need their raw images
+    def compose(self, RawImagePaths):
+        if not os.path.exists(self.RawDirectory):
+            os.makedirs(self.RawDirectory)
+        for PageIndex in self.DirtyPages:
+            try:
+                with PILImage.open(self.getRawPagePath(PageIndex)) as ExistingPage:
+                    PageImage = ExistingPage.convert("RGBA")
+            except OSError:
+                PageImage = PILImage.new("RGBA", (AtlasSize, AtlasSize), (0, 0, 0, 0))
+            for x, y, Width, Height in self.ClearedSlots.get(PageIndex, []):
+                PageImage.paste((0, 0, 0, 0), (x, y, x+Width, y+Height))
+            for id, Placement in self.Pages[PageIndex]["Images"].items():
+                if id in RawImagePaths:
+                    x, y, Width, Height = Placement["Slot"]
+                    PageImage.paste((0, 0, 0, 0), (x, y, x+Width, y+Height))
+                    with PILImage.open(RawImagePaths[id]) as Image:
+                        PageImage.paste(Image.convert("RGBA"), (x, y))
+            PageImage.save(self.getRawPagePath(PageIndex))
+
+# Writes the index of an atlas, done by the executor once the atlas pages are imported so the index always matches the textures
+def saveAtlasIndex(Path, Pages):
+    with open(Path + ".part", 'w') as handler:
+        json.dump(Pages, handler)
+    os.replace(Path + ".part", Path)
+
+# Splits a list of node ids into batches bounded by both count and total length of the ids parameter
+def batchIDs(IDs):
+    Batches = []
+    Batch = []
+    BatchLength = 0
+    for id in IDs:
+        if Batch and (len(Batch) >= ImageBatchSize or BatchLength + len(id) + 1 > ImageBatchMaxLength):
+            Batches.append(Batch)
+            Batch = []
+            BatchLength = 0
+        Batch.append(id)
+        BatchLength += len(id) + 1
+    if Batch:
+        Batches.append(Batch)
+    return Batches
+
+# Gets the colour of a single solid paint including its opacity and the opacity of the node, or None if the paint can't be drawn as a flat colour
+def getSolidPaintColor(Paint, NodeOpacity):
+    if Paint["type"] != "SOLID" or Paint.get("blendMode", "NORMAL") not in ["NORMAL", "PASS_THROUGH"]:
+        return None
+    return {
+                "r" : Paint["color"]["r"],
+                "g" : Paint["color"]["g"],
+                "b" : Paint["color"]["b"],
+                "a" : Paint["color"].get("a", 1) * Paint.get("opacity", 1) * NodeOpacity
+            }
+
+# Works out how to draw a rectangle, circle or straight line natively with a rounded box brush, returns None if it has to be rendered to an image instead
+def getNativeShape(NodeDict):
+    if NodeDict["type"] not in NativeShapeTypes:
+        return None
+    if not NodeDict.get("visible", True): # Hidden layers are left to the image path, which Figma renders no image for, so they are skipped
+        return None
+    Rotation = NodeDict.get("rotation", 0)
+    VerticalLine = NodeDict["type"] == "LINE" and abs(abs(Rotation) - 90) <= 0.001 # Figma stores vertical lines as horizontal lines turned by 90 degrees
+    if any(Effect.get("visible", True) for Effect in NodeDict.get("effects", [])) or (abs(Rotation) > 0.001 and not VerticalLine) or NodeDict.get("strokeDashes"):
+        return None
+    if NodeDict.get("blendMode", "PASS_THROUGH") not in ["NORMAL", "PASS_THROUGH"] or NodeDict.get("isMask"):
+        return None
+    NodeOpacity = NodeDict.get("opacity", 1)
+    Fills = [Fill for Fill in NodeDict.get("fills", []) if Fill.get("visible", True)]
+    Strokes = [Stroke for Stroke in NodeDict.get("strokes", []) if Stroke.get("visible", True)]
+    if len(Fills) > 1 or len(Strokes) > 1:
+        return None
+    FillColor = getSolidPaintColor(Fills[0], NodeOpacity) if Fills else {"r" : 0, "g" : 0, "b" : 0, "a" : 0}
+    StrokeColor = getSolidPaintColor(Strokes[0], NodeOpacity) if Strokes else {"r" : 0, "g" : 0, "b" : 0, "a" : 0}
+    if FillColor is None or StrokeColor is None:
+        return None
+    StrokeWeight = NodeDict.get("strokeWeight", 0) if Strokes else 0
+    Width = NodeDict["absoluteBoundingBox"]["width"]
+    Height = NodeDict["absoluteBoundingBox"]["height"]
+    Shape = {
+                "Size" : [Width, Height],
+                "Offset" : [0, 0],
+                "Color" : FillColor,
+                "CornerRadii" : [0, 0, 0, 0],
+                "OutlineColor" : StrokeColor,
+                "OutlineWidth" : StrokeWeight
+            }
+    if NodeDict["type"] == "LINE": # Only horizontal and vertical lines with a centred stroke are drawn as a thin rectangle
+        if not Strokes or NodeDict.get("strokeAlign", "CENTER") != "CENTER" or NodeDict.get("strokeCap", "NONE") != "NONE":
+            return None
+        Length = max(Width, Height) # The bounding box is axis aligned so its other side is zero
+        Shape["Size"] = [StrokeWeight, Length] if VerticalLine else [Length, StrokeWeight]
+        Shape["Offset"] = [-StrokeWeight/2, 0] if VerticalLine else [0, -StrokeWeight/2]
+        Shape["Color"] = StrokeColor
+        Shape["OutlineWidth"] = 0
+        return Shape
+    if Strokes and NodeDict.get("strokeAlign", "INSIDE") != "INSIDE": # Brush outlines are drawn inside the edge of the widget
+        return None
+    MaxRadius = min(Width, Height)/2
+    if NodeDict["type"] == "ELLIPSE": # Only full circles can be drawn with a rounded box
+        ArcData = NodeDict.get("arcData", {"startingAngle" : 0, "endingAngle" : 6.2831853, "innerRadius" : 0})
+        if abs(Width - Height) > 0.01 or ArcData["innerRadius"] != 0 or abs(ArcData["endingAngle"] - ArcData["startingAngle"] - 6.2831853) > 0.001:
+            return None
+        Shape["CornerRadii"] = [MaxRadius, MaxRadius, MaxRadius, MaxRadius]
+    else:
+        CornerRadii = NodeDict.get("rectangleCornerRadii", [NodeDict.get("cornerRadius", 0)]*4)
+        Shape["CornerRadii"] = [min(Radius, MaxRadius) for Radius in CornerRadii]
+    return Shape
+
+# Walks children the same way createChildren does and yields every vector node along with the directory and id of the frame it will be added to
+# Also yields the directory of the canvas or component the vector belongs to, which is the group its image is atlased with
+def iterateVectors(ChildrenDict, Directory, ParentID, GroupDirectory):
+    for child in ChildrenDict:
+        if child["type"] in ContainerTypes:
+            ChildDirectory = Directory + sanitiseName(child["name"]) + "/"
+            yield from iterateVectors(child["children"], ChildDirectory, child["id"], ChildDirectory if child["type"] in ["COMPONENT", "COMPONENT_SET"] else GroupDirectory)
+        elif child["type"] in VectorTypes and getNativeShape(child) is None:
+            yield child, Directory, ParentID, GroupDirectory
+
+# Walks children the same way createChildren does and yields every text node
+def iterateTexts(ChildrenDict):
+    for child in ChildrenDict:
+        if child["type"] in ContainerTypes:
+            yield from iterateTexts(child["children"])
+        elif child["type"] == "TEXT":
+            yield child
+
+# Gets the family, weight and italic of a text style, along with the key and asset name shared by every text using the same face
+def getFontFace(Style):
+    Family = Style.get("fontFamily", "Inter")
+    Weight = int(Style.get("fontWeight", 400))
+    Italic = bool(Style.get("italic", False))
+    Name = sanitiseName(Family) + "_" + str(Weight) + ("_Italic" if Italic else "")
+    return {"Key" : Family + "/" + str(Weight) + ("/Italic" if Italic else ""), "Family" : Family, "Weight" : Weight, "Italic" : Italic, "PostScriptName" : Style.get("fontPostScriptName"), "Name" : Name}
+
+# Looks for a font file that has already been fetched or copied, or one with the font's PostScript name in a folder of fonts
+def findFontFile(Directory, Names):
+    if Directory is None:
+        return None
+    for Name in Names:
+        for Extension in FontExtensions:
+            if Name and os.path.exists(os.path.join(Directory, Name + Extension)):
+                return os.path.join(Directory, Name + Extension)
+    return None
+
+# Fetches the font file for a face from Google Fonts, returns the path it was saved to or None if Google Fonts doesn't have it
+def fetchGoogleFont(Session, Face, RawDirectory, Profiler=None):
+    Response = Session.get(GoogleFontsUrl, params={"family" : Face["Family"] + ":ital,wght@" + ("1" if Face["Italic"] else "0") + "," + str(Face["Weight"])})
+    if Response.status_code != 200: # Not a Google font or not available in this weight
+        return None
+    FontUrls = re.findall(r"url\((\S+?)\)", Response.text) # Clients that don't ask for woff2 are sent a single TrueType file
+    if not FontUrls:
+        return None
+    Path = RawDirectory + "FF_" + Face["Name"] + ".ttf"
+    downloadFile(Session, FontUrls[0], Path, Profiler)
+    return Path
+
+# Walks children the same way createChildren does and yields every node that becomes a widget blueprint along with the path of its asset
+def iterateBlueprints(ChildrenDict, Directory):
+    for child in ChildrenDict:
+        if child["type"] in ContainerTypes:
+            ChildDirectory = Directory + sanitiseName(child["name"]) + "/"
+            yield child, ChildDirectory + "WBP_" + sanitiseName(child["name"])
+            yield from iterateBlueprints(child["children"], ChildDirectory)
+
+# Helper function to sanitise name to use with unreal paths
+def sanitiseName(Name):
+        SanitisedName = (Name.replace(" ", "_").
+                     replace("-", "_").
+                     replace("(", "").
+                     replace(")", "").
+                     replace(".", "_").
+                     replace("\"", "").
+                     replace(",", "").
+                     replace("\'", "").
+                     replace("“", "").
+                     replace("”", "").
+                     replace("[","").
+                     replace("]","").
+                     replace("=", "").
+                     replace("#", "").
+                     splitlines(False)[0][:50])
+        return SanitisedName
+
+# Name of the raw image and texture a vector is rendered to, the node id keeps siblings with the same name such as "Vector" apart
+def getImageName(VectorDict):
+    return "T_" + sanitiseName(VectorDict["name"]) + "_" + VectorDict["id"].replace(":", "_").replace(";", "_")
+
+# Gets full path to bluerint class
+def getAssetPath(Directory, AssetName):
+    Path = Directory + AssetName + "." + AssetName + "_C"
+    return Path
+
+# Create unique instance name to avoid conflicts
+def createInsatanceName(Name, id):
+    return Name + "_" + id
+
+# Convert Fills into a single colour
+def getColorFromFills(Fills, DefaultColor):
+        try: # May not have a background colour
+            Color = {
+                                "r" : Fills[0]["color"]["r"],
+                                "g" : Fills[0]["color"]["g"],
+                                "b" : Fills[0]["color"]["b"],
+                             }
+            try: # Only has opacity attribute if opacity not 1
+                Color["a"] = Fills[0]["opacity"]
+            except:
+                Color["a"] = 1
+        except:
+            Color = DefaultColor
+        return Color
+
+# Describes a widget to add to a frame, collected so every child of a frame is built with a single call to the importer library
+# The type is the name of a FigmaWidgetType, the executor turns the spec into a FigmaWidgetSpec
+def createWidgetSpec(Type, Name, Size, Position, Alignment, MinAnchors, MaxAnchors):
+    return {
+                "Type" : Type,
+                "Name" : Name,
+                "Size" : Size,
+                "Position" : Position,
+                "Alignment" : Alignment,
+                "MinAnchors" : MinAnchors,
+                "MaxAnchors" : MaxAnchors
+            }
+
+# Describes a widget blueprint to rebuild, its widgets are filled in as its children are planned
+# Dependencies are the rebuilt blueprints it places so the executor can save them first
+def createBlueprintPlan(id, Directory, AssetName, Size, BackgroundColor):
+    return {
+                "id" : id,
+                "Directory" : Directory,
+                "AssetPath" : Directory + AssetName,
+                "Size" : Size,
+                "BackgroundColor" : [BackgroundColor["r"], BackgroundColor["g"], BackgroundColor["b"], BackgroundColor["a"]],
+                "Widgets" : [],
+                "Dependencies" : []
+            }
+
+# Figma API uses absolute positions, we want relative positions
+def createRelativePosition(ParentPosition, ChildPosition):
+    RelativePosition = [ChildPosition[0]-ParentPosition[0],ChildPosition[1]-ParentPosition[1]]
+    return RelativePosition
+
+# Function to run through all the children of a frame and plan them recursively
+def createChildren(ChildrenDict, Planner, Parent):
+        Children = []
+        # Loop through all children and check the asset type
+        for child in ChildrenDict:
+            if child["type"] not in ContainerTypes and not Parent.Rebuild: # Parent blueprint is unchanged so only child blueprints may need rebuilding
+                continue
+            Planner.Profiler.startNode(child["type"])
+            if child["type"] == "FRAME":
+                ChildNode = FigmaFrame(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "GROUP":
+                ChildNode = FigmaFrame(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "COMPONENT_SET":
+                ChildNode = FigmaComponent(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "COMPONENT":
+                ChildNode = FigmaComponent(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "INSTANCE":
+                ChildNode = FigmaInstance(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif getNativeShape(child) is not None:
+                ChildNode = FigmaShape(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "VECTOR":
+                ChildNode = FigmaVector(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "LINE":
+                ChildNode = FigmaVector(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "BOOLEAN_OPERATION":
+                ChildNode = FigmaVector(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "ELLIPSE":
+                ChildNode = FigmaVector(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "REGULAR_POLYGON":
+                ChildNode = FigmaVector(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "STAR":
+                ChildNode = FigmaVector(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "RECTANGLE":
+                ChildNode = FigmaVector(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode )
+            elif child["type"] == "TEXT": 
+                ChildNode = FigmaText(Planner,child, Parent)
+                ChildNode.addToPlan()
+                Children.append(ChildNode ) 
+            Planner.Profiler.stopNode(child["name"] if child["type"] in ContainerTypes else None) # Only blueprints are traced individually
+        return Children
+
+# Checks for an asset by looking for its package in the project's Content folder, for planning without the editor
+def createContentAssetChecker(ProjectDirectory):
+    def assetExists(AssetPath):
+        if not AssetPath.startswith("/Game/"): # Plugin and engine assets are not in the Content folder
+            return True
+        return os.path.exists(ProjectDirectory + "Content/" + AssetPath[len("/Game/"):].split(".")[0] + ".uasset")
+    return assetExists
+
+# Writes a plan to disk so it can be executed later or on another machine along with the RawAssets folder
+def savePlan(Plan, Path):
+    with open(Path + ".part", 'w') as handler:
+        json.dump(Plan, handler, separators=(",", ":"))
+    os.replace(Path + ".part", Path)
+
+# Plans the import of a Figma document without touching Unreal, producing a plan that figmaApi applies in the editor
+# AssetExists checks whether an asset is in the project, without it the manifest and image cache are trusted
+# FontDirectory is an optional folder of font files named by PostScript name, used before fetching fonts from Google Fonts
+class FigmaPlanner():
+    def __init__(self, FileID, BaseDirectory, AccessToken, ProjectDirectory, Pages = [-1], DownloadWorkers = DownloadWorkers, MaxRawAssetBytes = MaxRawAssetBytes, AtlasImages = False, Session = None, AssetExists = None, ImportProfiler = None, FontDirectory = None):
+        self.FileID = FileID
+        self.BaseDirectory = BaseDirectory
+        self.AccessToken = AccessToken
+        self.ProjectDirectory = os.path.join(ProjectDirectory, "")
+        self.DownloadWorkers = DownloadWorkers
+        self.MaxRawAssetBytes = MaxRawAssetBytes
+        self.AtlasImages = AtlasImages
+        if self.AtlasImages and PILImage is None:
+            print("Pillow is not installed so images will not be packed into atlases")
+            self.AtlasImages = False
+        self.Session = Session if Session is not None else createSession(DownloadWorkers) # A stand-in session from figmaReplay can be passed to plan without the Figma API
+        self.AssetExists = AssetExists
+        self.FontDirectory = FontDirectory
+        self.Profiler = ImportProfiler if ImportProfiler is not None else Profiler()
+        self.Components = {}
+        self.Pages= Pages
+        self.Canvases = []
+        with self.Profiler.phase("readFile"):
+            self.readFile()
+
+    # Gets the absolute path of a directory in RawAssets
+    def getRawDirectory(self, Directory):
+        return self.ProjectDirectory + getRawImageDirectory(Directory)
+
+    # Gets a path relative to the project folder, which is how paths on disk are stored in the plan
+    def getRelativePath(self, Path):
+        return Path[len(self.ProjectDirectory):]
+
+    # Read in file from API, only fetching and keeping the pages being imported
+    def readFile(self):
+        FileUrl = FigmaApiUrl + "files/" + self.FileID
+        Params = {}
+        if self.Pages[0] != -1: # Look up the ids of the selected pages so only their subtrees are fetched
+            PageResponse = figmaGet(self.Session, FileUrl, self.AccessToken, {"depth" : 1}, Profiler=self.Profiler)
+            Params["ids"] = ",".join(Page["id"] for i, Page in enumerate(json.loads(PageResponse.text)["document"]["children"]) if i in self.Pages)
+        if ijson is not None:
+            with figmaGet(self.Session, FileUrl, self.AccessToken, Params, Stream=True, Profiler=self.Profiler) as FileResponse:
+                File = parseFileStream(FileResponse)
+                self.Profiler.count("FileBytes", FileResponse.raw.tell())
+        else:
+            FileResponse = figmaGet(self.Session, FileUrl, self.AccessToken, Params, Profiler=self.Profiler)
+            self.Profiler.count("FileBytes", len(FileResponse.content))
+            File = json.loads(FileResponse.text)
+        self.Name = sanitiseName(File["name"])
+        self.Version = File.get("version")
+        self.ComponentData = File.get("components", {}) # Every component used in the file, including ones on pages that aren't imported
+        self.Directory = self.BaseDirectory + self.Name +"/"
+        for CanvasContent in File["document"]["children"]:
+            self.Canvases.append(FigmaCanvas(CanvasContent, self))
+
+    # Compare every blueprint in the selected canvases against the manifest from the last import to find the ones that need rebuilding
+    def diffManifest(self):
+        self.ManifestPath = self.getRawDirectory(self.Directory) + "FigmaManifest.json"
+        try:
+            with open(self.ManifestPath, 'r') as handler:
+                self.Manifest = json.load(handler)
+        except (OSError, ValueError):
+            self.Manifest = {}
+        if self.Manifest.get("Version") != ManifestVersion: # Blueprints from an older importer need rebuilding
+            self.Manifest = {"Version" : ManifestVersion, "Blueprints" : {}}
+        self.BlueprintEntries = {}
+        self.RebuildIDs = set()
+        for Canvas in self.Canvases:
+            Blueprints = [(Canvas.CanvasContent, Canvas.Directory + "WBP_" + Canvas.Name)] + list(iterateBlueprints(Canvas.ChildrenDict, Canvas.Directory))
+            for NodeDict, AssetPath in Blueprints:
+                Entry = {"Hash" : getBlueprintHash(NodeDict, self.Fonts), "AssetPath" : AssetPath}
+                self.BlueprintEntries[NodeDict["id"]] = Entry
+                if self.Manifest["Blueprints"].get(NodeDict["id"]) != Entry or (self.AssetExists and not self.AssetExists(AssetPath)):
+                    self.RebuildIDs.add(NodeDict["id"])
+        self.Profiler.count("Blueprints", len(self.BlueprintEntries))
+        self.Profiler.count("BlueprintsRebuilt", len(self.RebuildIDs))
+        print("Rebuilding " + str(len(self.RebuildIDs)) + " of " + str(len(self.BlueprintEntries)) + " blueprints")
+
+    # Index every component in the selected pages by id before anything is planned, so instances can be resolved wherever they are
+    def indexComponents(self):
+        self.Components = {}
+        for Canvas in self.Canvases:
+            for NodeDict, AssetPath in iterateBlueprints(Canvas.ChildrenDict, Canvas.Directory):
+                if NodeDict["type"] in ["COMPONENT", "COMPONENT_SET"]:
+                    self.Components[NodeDict["id"]] = {"Directory" : AssetPath[:AssetPath.rindex("/")+1], "AssetName" : AssetPath[AssetPath.rindex("/")+1:]}
+
+    # Find every vector in the selected canvases and split them into images that are already imported and unchanged, and images that need rendering
+    def collectImages(self):
+        self.ImageCache = ImageCache(self.getRawDirectory(self.Directory) + "ImageCache.json", self.ProjectDirectory, self.MaxRawAssetBytes, self.AssetExists)
+        self.ImageHashes = {}
+        self.CachedImages = {}
+        self.PendingImages = {}
+        self.ImageGroups = {}
+        for Canvas in self.Canvases:
+            for VectorDict, Directory, ParentID, GroupDirectory in iterateVectors(Canvas.ChildrenDict, Canvas.Directory, Canvas.id, Canvas.Directory):
+                self.ImageGroups[VectorDict["id"]] = GroupDirectory
+                if ParentID not in self.RebuildIDs: # Image widget is only added again if its parent blueprint is rebuilt
+                    continue
+                Hash = getNodeHash(VectorDict)
+                self.ImageHashes[VectorDict["id"]] = Hash
+                ImagePath = Directory + "Images/" + getImageName(VectorDict)
+                Entry = self.ImageCache.find(self.getImageCacheKey(VectorDict["id"]), Hash, ImagePath, GroupDirectory if self.AtlasImages else None)
+                if Entry and self.AtlasImages and not Entry.get("AtlasGroup") and max(Entry["Size"]) <= AtlasMaxImageSize: # Small image imported before atlasing was turned on
+                    Entry = None
+                if Entry is None:
+                    self.PendingImages[VectorDict["id"]] = (VectorDict, Directory)
+                else:
+                    self.CachedImages[VectorDict["id"]] = Entry
+        self.Profiler.count("ImageCacheHits", len(self.CachedImages))
+        self.Profiler.count("ImageCacheMisses", len(self.PendingImages))
+
+    # Key used to store an image in the image cache, node ids are only unique within a file
+    def getImageCacheKey(self, id):
+        return self.FileID + "/" + id
+
+    # Request render URLs for every image that is not cached, batching ids rather than making one request per node
+    def requestImageURLs(self):
+        self.ImageURLs = {}
+        for Batch in batchIDs(list(self.PendingImages.keys())):
+            Response = figmaGet(self.Session, FigmaApiUrl + "images/" + self.FileID, self.AccessToken, {"ids": ",".join(Batch)}, Profiler=self.Profiler)
+            File = json.loads(Response.text)
+            if File.get("err"):
+                print("Error requesting image renders: " + str(File["err"]))
+            self.ImageURLs.update(File.get("images") or {})
+
+    # Download every rendered image to disk using a pool of worker threads
+    def downloadImages(self):
+        Downloads = {}
+        for VectorDict, Directory in self.PendingImages.values():
+            ImageURL = self.ImageURLs.get(VectorDict["id"])
+            if ImageURL is None: # Figma returns no URL for nodes it could not render
+                print("Unable to render image for: " + sanitiseName(VectorDict["name"]))
+                continue
+            RawImageDirectory = self.getRawDirectory(Directory)
+            if not os.path.exists(RawImageDirectory):
+                os.makedirs(RawImageDirectory)
+            Downloads[VectorDict["id"]] = (ImageURL, RawImageDirectory + getImageName(VectorDict) + ".png")
+        self.DownloadedImages = {}
+        with ThreadPoolExecutor(max_workers=self.DownloadWorkers) as Executor:
+            Futures = {Executor.submit(downloadFile, self.Session, ImageURL, RawImagePath, self.Profiler): id for id, (ImageURL, RawImagePath) in Downloads.items()}
+            for Future in as_completed(Futures):
+                try:
+                    Future.result()
+                    self.DownloadedImages[Futures[Future]] = Downloads[Futures[Future]][1]
+                except Exception as Error:
+                    print("Unable to download image for node " + Futures[Future] + ": " + str(Error))
+        if Downloads:
+            print("Downloaded " + str(len(self.DownloadedImages)) + " of " + str(len(Downloads)) + " images")
+
+    # Pack small downloaded images into an atlas per canvas or component, only composing the atlas pages that changed
+    # Atlas indexes are written by the executor once the pages are imported
+    def packAtlases(self):
+        self.AtlasedImages = {}
+        self.AtlasPages = []
+        self.Atlases = []
+        if not self.AtlasImages:
+            return
+        Groups = {}
+        for id, RawImagePath in self.DownloadedImages.items():
+            with PILImage.open(RawImagePath) as Image:
+                Size = list(Image.size)
+            if max(Size) <= AtlasMaxImageSize:
+                Groups.setdefault(self.ImageGroups[id], []).append((id, Size))
+        for GroupDirectory, Images in Groups.items():
+            Atlas = TextureAtlas(self.ProjectDirectory, GroupDirectory, "TA_" + GroupDirectory.rstrip("/").split("/")[-1])
+            for id in Atlas.getImageIDs():
+                if self.ImageGroups.get(id) != GroupDirectory: # No longer an image in this canvas or component
+                    Atlas.remove(id)
+            for id, Size in sorted(Images, key=lambda Image: -Image[1][1]): # Tallest first packs shelves more tightly
+                self.AtlasedImages[id] = (Atlas, Atlas.place(id, self.ImageHashes[id], Size), Size)
+            Atlas.compose({id : self.DownloadedImages[id] for id, Size in Images})
+            self.Atlases.append({"IndexPath" : self.getRelativePath(Atlas.IndexPath), "Pages" : Atlas.Pages})
+            for PageIndex in sorted(Atlas.DirtyPages):
+                self.AtlasPages.append((Atlas.getRawPagePath(PageIndex), Atlas.Directory, Atlas.getPagePath(PageIndex), [id for id in Atlas.Pages[PageIndex]["Images"] if id in self.AtlasedImages], len(self.Atlases) - 1))
+        if self.AtlasPages:
+            print("Packed " + str(len(self.AtlasedImages)) + " images into " + str(len(self.AtlasPages)) + " atlas pages")
+
+    # Find a font file for every distinct face used by text in the selected pages, fetching missing ones from Google Fonts in one batch
+    # Runs before the manifest is compared as the font each text resolves to is part of its blueprint's fingerprint
+    # Faces are imported once into the Fonts folder of the base directory and only listed for import again if their font asset is missing
+    def collectFonts(self):
+        self.Fonts = {}
+        self.FontImports = []
+        Faces = {}
+        for Canvas in self.Canvases:
+            for TextDict in iterateTexts(Canvas.ChildrenDict):
+                Face = getFontFace(TextDict["style"])
+                Faces.setdefault(Face["Key"], Face)
+        Directory = self.BaseDirectory + "Fonts/"
+        RawDirectory = self.getRawDirectory(Directory)
+        FontPaths = {}
+        NewFonts = set()
+        for Key, Face in Faces.items():
+            FontPaths[Key] = findFontFile(RawDirectory, ["FF_" + Face["Name"]])
+            if FontPaths[Key] is None:
+                UserFontPath = findFontFile(self.FontDirectory, [Face["PostScriptName"], Face["PostScriptName"] and Face["PostScriptName"].replace("-", "")])
+                if UserFontPath is not None: # Copied so the imported face is named after the face rather than the file
+                    if not os.path.exists(RawDirectory):
+                        os.makedirs(RawDirectory)
+                    FontPaths[Key] = RawDirectory + "FF_" + Face["Name"] + os.path.splitext(UserFontPath)[1]
+                    shutil.copyfile(UserFontPath, FontPaths[Key])
+                    NewFonts.add(Key)
+        Missing = [Key for Key in Faces if FontPaths[Key] is None]
+        if Missing:
+            if not os.path.exists(RawDirectory):
+                os.makedirs(RawDirectory)
+            with ThreadPoolExecutor(max_workers=self.DownloadWorkers) as Executor:
+                Futures = {Executor.submit(fetchGoogleFont, self.Session, Faces[Key], RawDirectory, self.Profiler): Key for Key in Missing}
+                for Future in as_completed(Futures):
+                    try:
+                        FontPaths[Futures[Future]] = Future.result()
+                    except Exception as Error:
+                        print("Unable to fetch font " + Futures[Future] + ": " + str(Error))
+                    if FontPaths[Futures[Future]] is not None:
+                        NewFonts.add(Futures[Future])
+        for Key, Face in Faces.items():
+            if FontPaths[Key] is None:
+                print("Unable to find font " + Key + ", using Inter instead")
+                continue
+            Font = {"AssetPath" : Directory + "F_" + Face["Name"], "TypefaceName" : Face["Name"]}
+            self.Fonts[Key] = Font
+            if Key in NewFonts or (self.AssetExists and not self.AssetExists(Font["AssetPath"])):
+                self.FontImports.append(dict(Font, RawPath=self.getRelativePath(FontPaths[Key]), Directory=Directory, FaceAssetPath=Directory + "FF_" + Face["Name"]))
+        self.Profiler.count("FontFaces", len(self.Fonts))
+        self.Profiler.count("FontsFetched", len(NewFonts))
+
+    # List every downloaded image and atlas page as a texture to import, along with the image cache entries the executor adds once it is imported
+    # Sizes come from the PNG headers so widgets can be planned before anything is imported
+    def planTextures(self):
+        self.PlannedImages = {}
+        self.Textures = []
+        for RawImagePath, Directory, ImagePath, IDs, AtlasIndex in self.AtlasPages:
+            Texture = {"RawPath" : self.getRelativePath(RawImagePath), "Directory" : Directory, "AssetPath" : ImagePath, "Atlas" : AtlasIndex, "Images" : []}
+            for id in IDs:
+                Atlas, PageIndex, ImageSize = self.AtlasedImages[id]
+                self.PlannedImages[id] = {"ImagePath" : ImagePath, "Size" : ImageSize, "UVRegion" : Atlas.getUVRegion(PageIndex, id)}
+                Texture["Images"].append({
+                                            "Key" : self.getImageCacheKey(id),
+                                            "Hash" : self.ImageHashes[id],
+                                            "RawImagePath" : self.getRelativePath(self.DownloadedImages[id]),
+                                            "ImagePath" : ImagePath,
+                                            "Size" : ImageSize,
+                                            "UVRegion" : self.PlannedImages[id]["UVRegion"],
+                                            "AtlasGroup" : self.ImageGroups[id],
+                                            "RawAtlasPath" : self.getRelativePath(RawImagePath)
+                                        })
+            self.Textures.append(Texture)
+        for id, RawImagePath in self.DownloadedImages.items():
+            if id not in self.AtlasedImages:
+                VectorDict, Directory = self.PendingImages[id]
+                ImagePath = Directory + "Images/" + getImageName(VectorDict) # Imported textures are named after their raw image
+                self.PlannedImages[id] = {"ImagePath" : ImagePath, "Size" : getPNGSize(RawImagePath)}
+                Image = {"Key" : self.getImageCacheKey(id), "Hash" : self.ImageHashes[id], "RawImagePath" : self.getRelativePath(RawImagePath), "ImagePath" : ImagePath, "Size" : self.PlannedImages[id]["Size"]}
+                self.Textures.append({"RawPath" : self.getRelativePath(RawImagePath), "Directory" : Directory + "Images/", "AssetPath" : ImagePath, "Images" : [Image]})
+
+    # Plan the blueprint of every canvas and all of their children, blueprints are listed children first
+    def planBlueprints(self):
+        self.Blueprints = []
+        for Canvas in self.Canvases:
+            self.Profiler.startNode("CANVAS")
+            Canvas.Rebuild = Canvas.id in self.RebuildIDs
+            if Canvas.Rebuild:
+                Canvas.Blueprint = createBlueprintPlan(Canvas.id, Canvas.Directory, "WBP_" + Canvas.Name, [10000,10000], Canvas.BackgroundColor) # Canvas Background set to arbitrary size of 10000x10000px
+            Canvas.Children = createChildren(Canvas.ChildrenDict, self, Canvas) # Recursively plans children
+            if Canvas.Rebuild:
+                self.Blueprints.append(Canvas.Blueprint)
+            Canvas.CanvasContent = None # Raw page is no longer needed once its nodes are planned
+            Canvas.ChildrenDict = None
+            self.Profiler.stopNode(Canvas.Name)
+
+    # Run every stage of planning and return the plan
+    def createPlan(self):
+        with self.Profiler.phase("collectFonts"):
+            self.collectFonts()
+        with self.Profiler.phase("diffManifest"):
+            self.diffManifest()
+        with self.Profiler.phase("indexComponents"):
+            self.indexComponents()
+        with self.Profiler.phase("collectImages"):
+            self.collectImages()
+        with self.Profiler.phase("requestImageURLs"):
+            self.requestImageURLs()
+        with self.Profiler.phase("downloadImages"):
+            self.downloadImages()
+        with self.Profiler.phase("packAtlases"):
+            self.packAtlases()
+        with self.Profiler.phase("planTextures"):
+            self.planTextures()
+        with self.Profiler.phase("planBlueprints"):
+            self.planBlueprints()
+        self.Manifest["Blueprints"].update(self.BlueprintEntries) # Manifest once every blueprint is built, the executor drops any it doesn't build
+        return {
+                    "Version" : PlanVersion,
+                    "FileID" : self.FileID,
+                    "Name" : self.Name,
+                    "Directory" : self.Directory,
+                    "ManifestPath" : self.getRelativePath(self.ManifestPath),
+                    "Manifest" : self.Manifest,
+                    "Textures" : self.Textures,
+                    "Fonts" : self.FontImports,
+                    "Blueprints" : self.Blueprints,
+                    "ImageCache" : {
+                                        "Path" : self.getRelativePath(self.ImageCache.Path),
+                                        "MaxBytes" : self.MaxRawAssetBytes,
+                                        "Reused" : [self.getImageCacheKey(id) for id in self.CachedImages]
+                                    },
+                    "Atlases" : self.Atlases
+                }
+
+class FigmaCanvas():
+    __slots__ = ["Planner", "CanvasContent", "Name", "id", "BackgroundColor", "ChildrenDict", "xPosition", "yPosition", "Directory", "Rebuild", "Blueprint", "Children"]
+
+    def __init__(self,CanvasContent, Planner):
+        self.Planner = Planner
+        self.CanvasContent = CanvasContent
+        self.Name = sanitiseName(self.CanvasContent["name"])
+        self.id = self.CanvasContent["id"]
+        try: # May not have a background colour
+                    self.BackgroundColor = {
+                                    "r" : self.CanvasContent["backgroundColor"]["r"],
+                                    "g" : self.CanvasContent["backgroundColor"]["g"],
+                                    "b" : self.CanvasContent["backgroundColor"]["b"],
+                                    "a" : self.CanvasContent["backgroundColor"]["a"]
+                                    }
+        except KeyError:
+                    self.BackgroundColor = {
+                                    "r" : 0.5,
+                                    "g" : 0.5,
+                                    "b" : 0.5,
+                                    "a" : 1
+                                    }
+        self.ChildrenDict = self.CanvasContent["children"]
+        self.xPosition = 0
+        self.yPosition = 0
+        self.Directory = self.Planner.Directory+self.Name+"/"
+
+# Standard Figma frame holds children
+class FigmaFrame():
+    __slots__ = ["Planner", "Parent", "Name", "Directory", "Height", "Width", "xPosition", "yPosition", "id", "MinAnchors", "MaxAnchors", "Alignment", "ChildrenDict", "BackgroundColor", "AssetName", "Rebuild", "Blueprint", "Children"]
+
+    def __init__(self, Planner, FrameDict, Parent):
+        self.Planner = Planner
+        self.Parent = Parent
+        self.Name = sanitiseName(FrameDict["name"])
+        self.Directory = self.Parent.Directory +  self.Name + "/"
+        self.Height = FrameDict["absoluteBoundingBox"]["height"]
+        self.Width = FrameDict["absoluteBoundingBox"]["width"]
+        self.xPosition = FrameDict["absoluteBoundingBox"]["x"]
+        self.yPosition = FrameDict["absoluteBoundingBox"]["y"]
+        self.id = FrameDict["id"]
+        if type(self.Parent) == FigmaCanvas: # Check if parent is the canvas and set anchors accordingly
+            self.MinAnchors = [0.5,0.5]
+            self.MaxAnchors = [0.5,0.5]
+            self.Alignment = [0,0]
+        else:
+            self.MinAnchors = [0,0]
+            self.MaxAnchors = [0,0]
+            self.Alignment = [0,0] 
+
+        self.ChildrenDict = FrameDict["children"]
+        
+        self.BackgroundColor = getColorFromFills(FrameDict["fills"],{
+                                    "r" : 0,
+                                    "g" : 0,
+                                    "b" : 0,
+                                    "a" : 0
+                                    })
+            
+        
+    # Plan the frame's blueprint after its children so blueprints are listed children first, and add the frame to its parent
+    def addToPlan(self):
+        
+        self.AssetName = "WBP_" + self.Name
+        self.Rebuild = self.id in self.Planner.RebuildIDs # Unchanged blueprints are left untouched but their children may still need rebuilding
+
+        if self.Rebuild:
+            self.Blueprint = createBlueprintPlan(self.id, self.Directory, self.AssetName, [self.Width,self.Height], self.BackgroundColor)
+        self.Children = createChildren(self.ChildrenDict, self.Planner, self)
+        self.ChildrenDict = None # Raw children are no longer needed once their nodes are created
+        if self.Rebuild:
+            self.Planner.Blueprints.append(self.Blueprint)
+        if self.Parent.Rebuild:
+            Spec = createWidgetSpec("CHILD", createInsatanceName(self.Name, self.id), [self.Width,self.Height], createRelativePosition([self.Parent.xPosition, self.Parent.yPosition], [self.xPosition, self.yPosition]), self.Alignment, self.MinAnchors, self.MaxAnchors)
+            Spec["AssetPath"] = getAssetPath(self.Directory, self.AssetName)
+            self.Parent.Blueprint["Widgets"].append(Spec)
+            if self.Rebuild:
+                self.Parent.Blueprint["Dependencies"].append(self.Directory + self.AssetName)
+
+# Special frame class that can be instanced, indexed by the planner before any frames are planned
+class FigmaComponent(FigmaFrame):
+    __slots__ = []
+
+# An instance that references an existing component
+class FigmaInstance():
+    __slots__ = ["Planner", "Parent", "Name", "Directory", "Height", "Width", "xPosition", "yPosition", "id", "ComponentID", "MinAnchors", "MaxAnchors", "Alignment", "BackgroundColor"]
+
+    def __init__(self, Planner, FrameDict, Parent):
+        self.Planner = Planner
+        self.Parent = Parent
+        self.Name = sanitiseName(FrameDict["name"])
+        self.Directory = self.Parent.Directory +  self.Name + "/"
+        self.Height = FrameDict["absoluteBoundingBox"]["height"]
+        self.Width = FrameDict["absoluteBoundingBox"]["width"]
+        self.xPosition = FrameDict["absoluteBoundingBox"]["x"]
+        self.yPosition = FrameDict["absoluteBoundingBox"]["y"]
+        self.id = FrameDict["id"]
+        self.ComponentID = FrameDict["componentId"]
+        if type(self.Parent) == FigmaCanvas: # Check if parent is the canvas and set anchors accordingly
+            self.MinAnchors = [0.5,0.5]
+            self.MaxAnchors = [0.5,0.5]
+            self.Alignment = [0,0]
+        else:
+            self.MinAnchors = [0,0]
+            self.MaxAnchors = [0,0]
+            self.Alignment = [0,0] 
+
+        self.BackgroundColor = getColorFromFills(FrameDict["fills"],{
+                                    "r" : 0,
+                                    "g" : 0,
+                                    "b" : 0,
+                                    "a" : 0
+                                    })
+            
+        
+    # Add an instance of the source component to parent frame, the component is found in the index built by the planner
+    def addToPlan(self):
+        InstanceSource = self.Planner.Components.get(self.ComponentID)
+        if InstanceSource is None:
+            ComponentName = self.Planner.ComponentData.get(self.ComponentID, {}).get("name", self.ComponentID)
+            print("Unable to find source component " + ComponentName + " for " + self.Name + ", it may be on a page that isn't being imported or in a library")
+            return
+        Spec = createWidgetSpec("CHILD", createInsatanceName(self.Name, self.id), [self.Width,self.Height], createRelativePosition([self.Parent.xPosition, self.Parent.yPosition], [self.xPosition, self.yPosition]), self.Alignment, self.MinAnchors, self.MaxAnchors)
+        Spec["AssetPath"] = getAssetPath(InstanceSource["Directory"], InstanceSource["AssetName"])
+        self.Parent.Blueprint["Widgets"].append(Spec)
+        if self.ComponentID in self.Planner.RebuildIDs:
+            self.Parent.Blueprint["Dependencies"].append(InstanceSource["Directory"] + InstanceSource["AssetName"])
+
+# A vector is the base class for all shapes and images in Figma
+class FigmaVector():
+    __slots__ = ["Planner", "Name", "Height", "Width", "xPosition", "yPosition", "id", "MinAnchors", "MaxAnchors", "Alignment", "Parent"]
+
+    def __init__(self, Planner, VectorDict, Parent):
+        self.Planner = Planner
+        self.Name = sanitiseName(VectorDict["name"])
+        self.Height = VectorDict["absoluteBoundingBox"]["height"]
+        self.Width = VectorDict["absoluteBoundingBox"]["width"]
+        self.xPosition = VectorDict["absoluteBoundingBox"]["x"]
+        self.yPosition = VectorDict["absoluteBoundingBox"]["y"]
+        self.id = VectorDict["id"]
+        self.MinAnchors = [0,0]
+        self.MaxAnchors = [0,0]
+        self.Alignment = [0,0]
+        self.Parent = Parent
+
+    # Add image to parent frame, the image is rendered and downloaded ahead of time by the planner
+    def addToPlan(self):
+        if self.id in self.Planner.CachedImages: # Unchanged since the last import so reuse the existing texture
+            Image = self.Planner.CachedImages[self.id]
+        elif self.id in self.Planner.PlannedImages:
+            Image = self.Planner.PlannedImages[self.id]
+        else:
+            self.Planner.Profiler.count("MissingImages")
+            return
+        Spec = createWidgetSpec("IMAGE",
+                                createInsatanceName(self.Name, self.id),
+                                Image["Size"], # Use the image size rather than stated size to enable LINE to work which reports 0 width
+                                createRelativePosition([self.Parent.xPosition, self.Parent.yPosition],
+                                [self.xPosition, self.yPosition]),
+                                self.Alignment, self.MinAnchors, self.MaxAnchors)
+        Spec["AssetPath"] = Image["ImagePath"] # May be an atlas shared with other images
+        if Image.get("UVRegion"):
+            Spec["UVRegion"] = Image["UVRegion"]
+        self.Parent.Blueprint["Widgets"].append(Spec)
+
+# Simple rectangles, circles and straight lines drawn natively without rendering an image
+class FigmaShape():
+    __slots__ = ["Planner", "Name", "xPosition", "yPosition", "id", "MinAnchors", "MaxAnchors", "Alignment", "Parent", "Shape"]
+
+    def __init__(self, Planner, ShapeDict, Parent):
+        self.Planner = Planner
+        self.Name = sanitiseName(ShapeDict["name"])
+        self.xPosition = ShapeDict["absoluteBoundingBox"]["x"]
+        self.yPosition = ShapeDict["absoluteBoundingBox"]["y"]
+        self.id = ShapeDict["id"]
+        self.MinAnchors = [0,0]
+        self.MaxAnchors = [0,0]
+        self.Alignment = [0,0]
+        self.Parent = Parent
+        self.Shape = getNativeShape(ShapeDict)
+
+    # Adds a rectangle to parent frame
+    def addToPlan(self):
+        Spec = createWidgetSpec("RECTANGLE",
+                                createInsatanceName(self.Name, self.id),
+                                self.Shape["Size"],
+                                createRelativePosition([self.Parent.xPosition, self.Parent.yPosition],
+                                [self.xPosition + self.Shape["Offset"][0], self.yPosition + self.Shape["Offset"][1]]),
+                                self.Alignment, self.MinAnchors, self.MaxAnchors)
+        Color = self.Shape["Color"]
+        OutlineColor = self.Shape["OutlineColor"]
+        Spec["Color"] = [Color["r"],Color["g"],Color["b"],Color["a"]]
+        Spec["CornerRadii"] = self.Shape["CornerRadii"]
+        Spec["OutlineColor"] = [OutlineColor["r"],OutlineColor["g"],OutlineColor["b"],OutlineColor["a"]]
+        Spec["OutlineWidth"] = self.Shape["OutlineWidth"]
+        self.Parent.Blueprint["Widgets"].append(Spec)
+
+# Text class, each text uses the font face for its family, weight and italic or the plugin's Inter font if none could be found
+class FigmaText():
+    __slots__ = ["Planner", "Name", "Height", "Width", "xPosition", "yPosition", "id", "Parent", "Content", "FontSize", "FontColor", "FontKey", "MinAnchors", "MaxAnchors", "Alignment"]
+
+    def __init__(self, Planner, TextDict, Parent):
+        self.Planner = Planner
+        self.Name = sanitiseName(TextDict["name"])
+        self.Height = TextDict["absoluteBoundingBox"]["height"]
+        self.Width = TextDict["absoluteBoundingBox"]["width"]
+        self.xPosition = TextDict["absoluteBoundingBox"]["x"]
+        self.yPosition = TextDict["absoluteBoundingBox"]["y"]
+        self.id = TextDict["id"]
+        self.Parent = Parent
+        self.Content = TextDict["characters"]
+        self.FontSize = TextDict["style"]["fontSize"]
+        self.FontColor = getColorFromFills(TextDict["fills"],{
+                                "r" : 0,
+                                "g" : 0,
+                                "b" : 0,
+                                "a" : 1,
+                             })
+
+        self.FontKey = getFontFace(TextDict["style"])["Key"] # Face found by the planner's collectFonts
+        self.MinAnchors = [0,0]
+        self.MaxAnchors = [0,0]
+        self.Alignment = [0,0]
+
+
+    # Adds text to parent frame, the font is created by the executor and shared by every text with the same face and size
+    def addToPlan(self):
+        Spec = createWidgetSpec("TEXT", createInsatanceName(self.Name, self.id), [self.Width,self.Height], createRelativePosition([self.Parent.xPosition, self.Parent.yPosition], [self.xPosition, self.yPosition]), self.Alignment, self.MinAnchors, self.MaxAnchors)
+        Spec["Text"] = self.Content
+        Spec["Font"] = dict(self.Planner.Fonts.get(self.FontKey) or {}, Size=self.FontSize) # No face uses the default font
+        Spec["Color"] = [self.FontColor["r"],self.FontColor["g"],self.FontColor["b"],self.FontColor["a"]]
+        self.Parent.Blueprint["Widgets"].append(Spec)
+
+def main():
+    Parser = argparse.ArgumentParser(description="Plan the import of a Figma file without Unreal")
+    Parser.add_argument("FileID")
+    Parser.add_argument("AccessToken", help="Personal access token, or - to read it from the " + AccessTokenVariable + " environment variable")
+    Parser.add_argument("ProjectDirectory", help="Folder of the Unreal project the plan will be executed in, images are downloaded to its RawAssets folder")
+    Parser.add_argument("PlanPath")
+    Parser.add_argument("--base-directory", default="/Game/", help="Content directory to import into")
+    Parser.add_argument("--pages", type=int, nargs="*", default=[-1], help="Indices of the pages to import, -1 for all")
+    Parser.add_argument("--workers", type=int, default=DownloadWorkers, help="Number of images downloaded at once")
+    Parser.add_argument("--atlas", action="store_true", help="Pack small images into atlases (needs Pillow)")
+    Parser.add_argument("--fonts", help="Folder of font files named by PostScript name to use before fetching fonts from Google Fonts")
+    Arguments = Parser.parse_args()
+    AccessToken = os.environ[AccessTokenVariable] if Arguments.AccessToken == "-" else Arguments.AccessToken # Keeps the token out of the process list when run by runBatchImport.py
+    ProjectDirectory = os.path.join(Arguments.ProjectDirectory, "")
+    AssetExists = createContentAssetChecker(ProjectDirectory) if os.path.exists(ProjectDirectory + "Content") else None
+    Planner = FigmaPlanner(Arguments.FileID, Arguments.base_directory, AccessToken, ProjectDirectory, Arguments.pages, Arguments.workers, AtlasImages=Arguments.atlas, AssetExists=AssetExists, FontDirectory=Arguments.fonts)
+    Plan = Planner.createPlan()
+    savePlan(Plan, Arguments.PlanPath)
+    Planner.Profiler.save(Planner.getRawDirectory(Planner.Directory), "Plan")
+    print("Planned " + str(len(Plan["Blueprints"])) + " blueprints and " + str(len(Plan["Textures"])) + " textures to " + Arguments.PlanPath)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+# Stand-in for the Figma API used to time and check the importer without a Figma account
+# Sessions here can be passed to FigmaDocument in place of a requests session, only the parts of requests the importer uses are provided
+
+import json
+import os
+import io
+import time
+import random
+import threading
+import hashlib
+import collections
+import struct
+import zlib
+from urllib.parse import urlencode, quote, unquote
+
+ReplayImageUrl = "https://replay.invalid/render/" # Download URLs handed out for synthetic renders, never requested over the network
+ReplayFontUrl = "https://replay.invalid/font/" # Font file URLs handed out for synthetic fonts
+SyntheticFont = b"\x00\x01\x00\x00" + bytes(252) # Stands in for a TrueType file, only its size matters outside Unreal
+
+# Error raised for failed responses, like requests.HTTPError
+class ReplayError(Exception):
+    pass
+
+# Response served from a recording or a synthetic document, supports both normal and streamed reads
+class ReplayResponse():
+    def __init__(self, StatusCode, Content, Headers = None):
+        self.status_code = StatusCode
+        self.content = Content
+        self.headers = Headers or {}
+        self.raw = io.BytesIO(Content)
+        self.raw.decode_content = False
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size = 1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i+chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ReplayError(str(self.status_code) + " error for replayed request")
+
+    def close(self):
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *Args):
+        self.close()
+        return False
+
+# Works out which kind of request a URL is so requests can be counted separately
+def getRequestKind(Url):
+    if "/v1/files/" in Url:
+        return "files"
+    if "/v1/images/" in Url:
+        return "images"
+    if "fonts.googleapis.com" in Url:
+        return "fonts"
+    return "download"
+
+# Key a recorded response is stored under, the access token is never part of it
+def getRequestKey(Url, Params):
+    if not Params:
+        return Url
+    return Url + "?" + urlencode(sorted(Params.items()))
+
+# Builds a minimal RGBA PNG of a single colour without needing Pillow
+def createPNG(Width, Height, Color = (128, 128, 128, 255)):
+    def createChunk(Type, Body):
+        return struct.pack(">I", len(Body)) + Type + Body + struct.pack(">I", zlib.crc32(Type + Body) & 0xffffffff)
+    Row = b"\x00" + bytes(Color) * Width
+    return (b"\x89PNG\r\n\x1a\n" +
+            createChunk(b"IHDR", struct.pack(">IIBBBBB", Width, Height, 8, 6, 0, 0, 0)) +
+            createChunk(b"IDAT", zlib.compress(Row * Height)) +
+            createChunk(b"IEND", b""))
+
+# Gets the width and height from the header of a PNG
+def getPNGSize(Content):
+    return list(struct.unpack(">II", Content[16:24]))
+
+# Answers a files request the way the Figma API does for the depth and ids parameters the importer uses
+def getFileSubset(File, Params):
+    Pages = File["document"]["children"]
+    if "ids" in Params:
+        IDs = Params["ids"].split(",")
+        Pages = [Page for Page in Pages if Page["id"] in IDs]
+    if Params.get("depth") == 1:
+        Pages = [dict(Page, children=[]) for Page in Pages]
+    return dict(File, document=dict(File["document"], children=Pages))
+
+# Serves responses recorded by a RecordingSession, with optional latency and rate limiting
+# Render requests are answered from every recorded render so a change to how ids are batched can still be replayed
+class ReplaySession():
+    def __init__(self, Directory = None, Latency = 0, RateLimitRate = 0, RetryAfter = 0.1, Seed = 0):
+        self.Directory = Directory
+        self.Latency = Latency # Seconds added to every request
+        self.RateLimitRate = RateLimitRate # Fraction of API requests answered with a 429
+        self.RetryAfter = RetryAfter
+        self.Random = random.Random(Seed)
+        self.Lock = threading.Lock()
+        self.Requests = collections.Counter()
+        self.BytesServed = 0
+        self.Index = {}
+        self.ImageURLs = None
+        if Directory is not None:
+            with open(os.path.join(Directory, "index.json"), 'r') as handler:
+                self.Index = json.load(handler)
+
+    def mount(self, Prefix, Adapter):
+        pass
+
+    def close(self):
+        pass
+
+    # Total number of requests made to the Figma API itself, not counting image downloads
+    def getApiRequestCount(self):
+        return self.Requests["files"] + self.Requests["images"]
+
+    def get(self, Url, headers = None, params = None, stream = False, timeout = None):
+        Kind = getRequestKind(Url)
+        with self.Lock:
+            self.Requests[Kind] += 1
+            RateLimited = Kind in ["files", "images"] and self.Random.random() < self.RateLimitRate
+            if RateLimited:
+                self.Requests["rate_limited"] += 1
+        if self.Latency:
+            time.sleep(self.Latency)
+        if RateLimited:
+            return ReplayResponse(429, b'{"status":429,"err":"Rate limit exceeded"}', {"Retry-After" : str(self.RetryAfter)})
+        StatusCode, Content = self.respond(Url, params or {})
+        with self.Lock:
+            self.BytesServed += len(Content)
+        return ReplayResponse(StatusCode, Content)
+
+    def readRecording(self, Key):
+        Entry = self.Index[Key]
+        with open(os.path.join(self.Directory, Entry["Path"]), 'rb') as handler:
+            return Entry["Status"], handler.read()
+
+    def respond(self, Url, Params):
+        Key = getRequestKey(Url, Params)
+        if Key in self.Index:
+            return self.readRecording(Key)
+        if getRequestKind(Url) == "images" and "ids" in Params:
+            with self.Lock:
+                if self.ImageURLs is None:
+                    self.ImageURLs = {}
+                    for RecordedKey, Entry in self.Index.items():
+                        if getRequestKind(RecordedKey) == "images" and Entry["Status"] == 200:
+                            self.ImageURLs.update(json.loads(self.readRecording(RecordedKey)[1]).get("images") or {})
+            Images = {id : self.ImageURLs.get(id) for id in Params["ids"].split(",")}
+            return 200, json.dumps({"err" : None, "images" : Images}).encode("utf-8")
+        return 404, b'{"status":404,"err":"Not found"}'
+
+# Serves a document held in memory, such as one made by createSyntheticFile, along with a flat colour render of every node
+class SyntheticSession(ReplaySession):
+    def __init__(self, File, Latency = 0, RateLimitRate = 0, RetryAfter = 0.1, Seed = 0):
+        super().__init__(None, Latency, RateLimitRate, RetryAfter, Seed)
+        self.File = File
+        self.Nodes = {}
+        self.PNGs = {}
+        Stack = list(File["document"]["children"])
+        while Stack:
+            NodeDict = Stack.pop()
+            self.Nodes[NodeDict["id"]] = NodeDict
+            Stack.extend(NodeDict.get("children", []))
+
+    # Size of the image Figma would render for a node at a scale of 1
+    def getRenderSize(self, NodeDict):
+        Bounds = NodeDict.get("absoluteRenderBounds") or NodeDict["absoluteBoundingBox"]
+        return max(1, int(round(Bounds["width"]))), max(1, int(round(Bounds["height"])))
+
+    def respond(self, Url, Params):
+        Kind = getRequestKind(Url)
+        if Kind == "files":
+            return 200, json.dumps(getFileSubset(self.File, Params)).encode("utf-8")
+        if Kind == "images":
+            Images = {id : ReplayImageUrl + quote(id, safe="") + ".png" if id in self.Nodes else None for id in Params.get("ids", "").split(",")}
+            return 200, json.dumps({"err" : None, "images" : Images}).encode("utf-8")
+        if Kind == "fonts": # Every family is available in every weight, with the stylesheet Google Fonts sends clients that can't use woff2
+            Family = Params.get("family", "")
+            return 200, ("@font-face {\n  font-family: '" + Family.split(":")[0] + "';\n  src: url(" + ReplayFontUrl + quote(Family, safe="") + ".ttf) format('truetype');\n}\n").encode("utf-8")
+        if Url.startswith(ReplayFontUrl):
+            return 200, SyntheticFont
+        if Url.startswith(ReplayImageUrl):
+            NodeDict = self.Nodes.get(unquote(Url[len(ReplayImageUrl):-len(".png")]))
+            if NodeDict is not None:
+                Size = self.getRenderSize(NodeDict)
+                with self.Lock: # Images of the same size are identical so each size is only encoded once
+                    if Size not in self.PNGs:
+                        self.PNGs[Size] = createPNG(*Size)
+                    return 200, self.PNGs[Size]
+        return 404, b'{"status":404,"err":"Not found"}'
+
+# Wraps a real session and records every successful response to a directory so an import can be replayed with a ReplaySession
+class RecordingSession():
+    def __init__(self, Session, Directory):
+        self.Session = Session
+        self.Directory = Directory
+        self.Lock = threading.Lock()
+        self.Index = {}
+        if not os.path.exists(Directory):
+            os.makedirs(Directory)
+
+    def mount(self, Prefix, Adapter):
+        self.Session.mount(Prefix, Adapter)
+
+    def close(self):
+        self.Session.close()
+
+    def get(self, Url, headers = None, params = None, stream = False, timeout = None):
+        Response = self.Session.get(Url, headers=headers, params=params, timeout=timeout)
+        Content = Response.content
+        if Response.status_code == 200:
+            Key = getRequestKey(Url, params)
+            Path = hashlib.sha1(Key.encode("utf-8")).hexdigest() + ".bin"
+            with open(os.path.join(self.Directory, Path), 'wb') as handler:
+                handler.write(Content)
+            with self.Lock:
+                self.Index[Key] = {"Status" : 200, "Path" : Path}
+        Headers = {Key : Value for Key, Value in Response.headers.items() if Key == "Retry-After"}
+        Response.close()
+        return ReplayResponse(Response.status_code, Content, Headers)
+
+    # Write the index of recorded responses, call once the import has finished
+    def save(self):
+        with open(os.path.join(self.Directory, "index.json"), 'w') as handler:
+            json.dump(self.Index, handler)
+
+# Builds a Figma file with roughly the requested number of nodes, using a mix of node types similar to a real UI file
+# The same seed always gives the same file so results can be compared between runs
+class SyntheticFileBuilder():
+    LeafTypes = ["VECTOR", "RECTANGLE", "ELLIPSE", "STAR", "LINE", "TEXT", "INSTANCE"]
+    LeafWeights = [25, 20, 10, 5, 5, 30, 5]
+    ImageSizes = [16, 24, 32, 48, 64, 96, 128, 200, 320]
+
+    def __init__(self, Seed):
+        self.Random = random.Random(Seed)
+        self.Count = 0
+        self.Components = []
+
+    def createID(self):
+        self.Count += 1
+        return "1:" + str(self.Count)
+
+    def createBounds(self, x, y, Width, Height):
+        return {"x" : x, "y" : y, "width" : Width, "height" : Height}
+
+    def createPaint(self):
+        return {"type" : "SOLID", "blendMode" : "NORMAL", "color" : {"r" : self.Random.random(), "g" : self.Random.random(), "b" : self.Random.random(), "a" : 1}}
+
+    def createLeaf(self, x, y):
+        Type = self.Random.choices(self.LeafTypes, self.LeafWeights)[0]
+        if Type == "INSTANCE" and not self.Components:
+            Type = "VECTOR"
+        id = self.createID()
+        Size = self.Random.choice(self.ImageSizes)
+        NodeDict = {"id" : id, "name" : Type.title() + " " + str(self.Count), "type" : Type, "blendMode" : "PASS_THROUGH", "absoluteBoundingBox" : self.createBounds(x, y, Size, Size), "fills" : [self.createPaint()], "strokes" : [], "effects" : []}
+        if Type == "TEXT":
+            NodeDict["absoluteBoundingBox"]["height"] = 20
+            NodeDict["characters"] = "Label " + str(self.Count)
+            NodeDict["style"] = {"fontFamily" : self.Random.choice(["Inter", "Roboto"]), "fontWeight" : self.Random.choice([400, 700]), "italic" : False, "fontSize" : self.Random.choice([12, 14, 16, 24])}
+        elif Type == "INSTANCE":
+            Component = self.Random.choice(self.Components)
+            NodeDict["componentId"] = Component["id"]
+            NodeDict["absoluteBoundingBox"] = dict(Component["absoluteBoundingBox"], x=x, y=y)
+            NodeDict["children"] = []
+        elif Type == "LINE":
+            NodeDict["absoluteBoundingBox"]["height"] = 0
+            NodeDict["fills"] = []
+            NodeDict["strokes"] = [self.createPaint()]
+            NodeDict["strokeWeight"] = 1
+        elif Type == "RECTANGLE":
+            NodeDict["cornerRadius"] = self.Random.choice([0, 4, 8])
+            if self.Random.random() < 0.3: # Drop shadows have to be rendered to an image
+                NodeDict["effects"] = [{"type" : "DROP_SHADOW", "visible" : True, "radius" : 4}]
+        elif Type == "ELLIPSE" and self.Random.random() < 0.3: # Ovals have to be rendered to an image
+            NodeDict["absoluteBoundingBox"]["height"] = Size // 2
+        return NodeDict
+
+    # Adds children to a container until it holds about Budget nodes including itself
+    def createContainer(self, Type, Depth, x, y, Budget):
+        id = self.createID()
+        NodeDict = {"id" : id, "name" : Type.title() + " " + str(self.Count), "type" : Type, "absoluteBoundingBox" : self.createBounds(x, y, 800, 600), "fills" : [self.createPaint()] if Type != "GROUP" else [], "children" : []}
+        Start = self.Count - 1
+        while self.Count - Start < Budget:
+            Remaining = Budget - (self.Count - Start)
+            ChildX = x + self.Random.randint(0, 700)
+            ChildY = y + self.Random.randint(0, 500)
+            if Depth < 4 and Remaining > 10 and self.Random.random() < 0.1:
+                NodeDict["children"].append(self.createContainer(self.Random.choice(["FRAME", "GROUP"]), Depth + 1, ChildX, ChildY, min(Remaining, self.Random.randint(5, 60))))
+            else:
+                NodeDict["children"].append(self.createLeaf(ChildX, ChildY))
+        return NodeDict
+
+    def createPage(self, Index, Budget, ComponentCount):
+        Page = {"id" : "0:" + str(Index + 1), "name" : "Page " + str(Index + 1), "type" : "CANVAS", "backgroundColor" : {"r" : 0.9, "g" : 0.9, "b" : 0.9, "a" : 1}, "children" : []}
+        Start = self.Count
+        for i in range(ComponentCount): # Components come first so instances later on the page can use them
+            Component = self.createContainer("COMPONENT", 1, i * 100, -1000, self.Random.randint(3, 10))
+            self.Components.append(Component)
+            Page["children"].append(Component)
+        while self.Count - Start < Budget:
+            Page["children"].append(self.createContainer("FRAME", 0, len(Page["children"]) * 1000, 0, min(Budget - (self.Count - Start), self.Random.randint(50, 400))))
+        return Page
+
+def createSyntheticFile(NodeCount, Seed = 0):
+    Builder = SyntheticFileBuilder(Seed)
+    PageCount = max(1, round(NodeCount / 10000))
+    Pages = [Builder.createPage(i, NodeCount // PageCount, max(2, NodeCount // 500) if i == 0 else 0) for i in range(PageCount)]
+    return {
+                "name" : "Benchmark " + str(NodeCount),
+                "version" : "1",
+                "document" : {"id" : "0:0", "name" : "Document", "type" : "DOCUMENT", "children" : Pages},
+                "components" : {Component["id"] : {"key" : Component["id"], "name" : Component["name"], "description" : ""} for Component in Builder.Components}
+            }
+
+# Changes the text or colour of a fraction of the leaf nodes in a file, like a designer touching up a file between syncs
+def editSyntheticFile(File, Fraction, Seed = 0):
+    Random = random.Random(Seed)
+    Edited = 0
+    Stack = list(File["document"]["children"])
+    while Stack:
+        NodeDict = Stack.pop()
+        if "children" in NodeDict:
+            Stack.extend(NodeDict["children"])
+        elif Random.random() < Fraction:
+            if NodeDict["type"] == "TEXT":
+                NodeDict["characters"] += " (edited)"
+            else:
+                Paints = NodeDict["fills"] or NodeDict["strokes"]
+                Paints[0]["color"]["r"] = Random.random()
+            Edited += 1
+    File["version"] = str(int(File["version"]) + 1)
+    return Edited
@@ -0,0 +1,214 @@
+# Imports many Figma files at once, split into shards that write to separate directories so several headless editors can run side by side
+# Each shard plans its files with figmaPlanner.py and then executes the plans in its own UnrealEditor-Cmd with runBatchShard.py
+# Usage: python runBatchImport.py <BatchFile> --project <Path>/<Project>.uproject --editor <Path>/UnrealEditor-Cmd [--workers 4]
+# The batch file is JSON listing the files to import: {"Files" : [{"FileID" : "...", "Pages" : [-1], "BaseDirectory" : "/Game/UI/"}]}
+# The access token is read from the FIGMA_ACCESS_TOKEN environment variable, or from "AccessToken" in the batch file
+# Progress is kept in a state file so running the same batch again only redoes the files that failed or never finished
+
+import sys
+import os
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ScriptDirectory = os.path.dirname(os.path.abspath(__file__))
+AccessTokenVariable = "FIGMA_ACCESS_TOKEN" # Same variable figmaPlanner.py reads the token from
+EditorArguments = ["-unattended", "-nopause", "-nosplash", "-stdout", "-FullStdOutLogOutput"]
+
+# Files imported into the same base directory are merged into one job with every page requested for them, as they share a manifest
+def createJobs(Files):
+    Jobs = {}
+    for File in Files:
+        BaseDirectory = os.path.join(File.get("BaseDirectory", "/Game/"), "")
+        Key = File["FileID"] + ":" + BaseDirectory
+        Pages = File.get("Pages", [-1])
+        if Key in Jobs:
+            Pages = [-1] if -1 in Pages or -1 in Jobs[Key]["Pages"] else sorted(set(Pages + Jobs[Key]["Pages"]))
+        Jobs[Key] = {"FileID" : File["FileID"], "BaseDirectory" : BaseDirectory, "Pages" : Pages}
+    return Jobs
+
+# Group jobs into shards that never write to the same directory, a base directory inside another is in the same shard as it
+def createShards(Jobs):
+    Shards = {}
+    for Key in sorted(Jobs, key=lambda Key: Jobs[Key]["BaseDirectory"]): # Parent directories sort before the directories inside them
+        BaseDirectory = Jobs[Key]["BaseDirectory"]
+        Root = next((Root for Root in Shards if BaseDirectory.startswith(Root)), BaseDirectory)
+        Shards.setdefault(Root, []).append(Key)
+    return list(Shards.items())
+
+# Last few lines of a log, shown when a step fails
+def getLogTail(LogPath, LineCount = 5):
+    try:
+        with open(LogPath, 'r', errors="replace") as handler:
+            return "".join(handler.readlines()[-LineCount:]).strip()
+    except OSError:
+        return ""
+
+# Status of every job in the batch, saved after every change so an interrupted batch can be resumed
+class BatchState():
+    def __init__(self, Path, Restart = False):
+        self.Path = Path
+        self.Lock = threading.Lock()
+        self.Jobs = {}
+        if not Restart:
+            try:
+                with open(self.Path, 'r') as handler:
+                    self.Jobs = json.load(handler)
+            except (OSError, ValueError):
+                self.Jobs = {}
+
+    def get(self, Key):
+        with self.Lock:
+            return dict(self.Jobs.get(Key, {"Status" : "Pending"}))
+
+    def update(self, Key, **Values):
+        with self.Lock:
+            self.Jobs.setdefault(Key, {"Status" : "Pending"}).update(Values, Updated=time.strftime("%Y-%m-%d %H:%M:%S"))
+            with open(self.Path + ".part", 'w') as handler:
+                json.dump(self.Jobs, handler, indent=4)
+            os.replace(self.Path + ".part", self.Path)
+
+# Plans and executes every shard, running up to Workers shards at once
+class BatchImport():
+    def __init__(self, Jobs, Project, Editor, AccessToken, Workers = 4, AtlasImages = False, Timeout = None, Restart = False, Replan = False, FontDirectory = None):
+        self.Jobs = Jobs
+        self.Project = os.path.abspath(Project)
+        self.Editor = Editor
+        self.Workers = Workers
+        self.AtlasImages = AtlasImages
+        self.Timeout = Timeout
+        self.Replan = Replan
+        self.FontDirectory = os.path.abspath(FontDirectory) if FontDirectory else None
+        self.ProjectDirectory = os.path.join(os.path.dirname(self.Project), "")
+        self.Directory = self.ProjectDirectory + "RawAssets/Batch/"
+        for Directory in ["Plans", "Shards", "Logs"]:
+            os.makedirs(self.Directory + Directory, exist_ok=True)
+        self.State = BatchState(self.Directory + "BatchState.json", Restart)
+        self.Environment = dict(os.environ, **{AccessTokenVariable : AccessToken}) # Passed to the planner through the environment rather than the command line
+        self.PrintLock = threading.Lock()
+
+    def report(self, ShardName, Message):
+        with self.PrintLock:
+            print(time.strftime("%H:%M:%S") + " [" + ShardName + "] " + Message, flush=True)
+
+    # Runs a command with its output appended to a log, returns the exit code or None if it timed out
+    def runProcess(self, Command, LogPath):
+        with open(LogPath, 'a') as handler:
+            handler.write("\n> " + " ".join(Command) + "\n")
+            handler.flush()
+            try:
+                return subprocess.run(Command, stdout=handler, stderr=subprocess.STDOUT, env=self.Environment, cwd=ScriptDirectory, timeout=self.Timeout).returncode
+            except subprocess.TimeoutExpired:
+                handler.write("Timed out after " + str(self.Timeout) + "s\n")
+                return None
+
+    def getPlanPath(self, Key):
+        return self.Directory + "Plans/" + hashlib.sha1(Key.encode("utf-8")).hexdigest()[:16] + ".json"
+
+    # Plans one job outside the editor, plans already made by an earlier run are reused unless replanning
+    def planJob(self, ShardName, Key, LogPath):
+        Job = self.Jobs[Key]
+        PlanPath = self.getPlanPath(Key)
+        State = self.State.get(Key)
+        if (State["Status"] == "Planned" or State.get("Stage") == "Execute") and os.path.exists(PlanPath) and not self.Replan: # Planned, or failed in the editor after planning
+            self.report(ShardName, "Reusing plan for " + Key)
+            return True
+        Command = [sys.executable, os.path.join(ScriptDirectory, "figmaPlanner.py"), Job["FileID"], "-", self.ProjectDirectory, PlanPath, "--base-directory", Job["BaseDirectory"], "--pages"] + [str(Page) for Page in Job["Pages"]]
+        if self.AtlasImages:
+            Command.append("--atlas")
+        if self.FontDirectory:
+            Command += ["--fonts", self.FontDirectory]
+        StartTime = time.perf_counter()
+        ExitCode = self.runProcess(Command, LogPath)
+        if ExitCode != 0:
+            self.State.update(Key, Status="Failed", Stage="Plan", Error=getLogTail(LogPath) or "Planner exited with code " + str(ExitCode))
+            self.report(ShardName, "Failed to plan " + Key + ", see " + LogPath)
+            return False
+        self.State.update(Key, Status="Planned", Stage="Plan", Error=None, PlanPath=PlanPath)
+        self.report(ShardName, "Planned " + Key + " in " + "{:.1f}".format(time.perf_counter() - StartTime) + "s")
+        return True
+
+    # Executes every planned job of a shard in one headless editor so the editor only starts once per shard
+    def executePlans(self, ShardName, Keys, LogPath):
+        ShardPath = self.Directory + "Shards/" + ShardName + ".json"
+        ResultPath = self.Directory + "Shards/" + ShardName + "Results.json"
+        if os.path.exists(ResultPath):
+            os.remove(ResultPath)
+        with open(ShardPath, 'w') as handler:
+            json.dump({"Plans" : {Key : self.getPlanPath(Key) for Key in Keys}, "ResultPath" : ResultPath}, handler, indent=4)
+        Command = [self.Editor, self.Project, "-run=pythonscript", "-script=" + os.path.join(ScriptDirectory, "runBatchShard.py") + " " + ShardPath] + EditorArguments
+        self.report(ShardName, "Executing " + str(len(Keys)) + " plans in the editor")
+        StartTime = time.perf_counter()
+        ExitCode = self.runProcess(Command, LogPath)
+        try:
+            with open(ResultPath, 'r') as handler:
+                Results = json.load(handler)
+        except (OSError, ValueError):
+            Results = {}
+        for Key in Keys:
+            Result = Results.get(Key)
+            if Result is None: # The editor exited before it got to this plan
+                Result = {"Status" : "Failed", "Error" : "Editor exited with code " + str(ExitCode) + " before executing the plan"}
+            self.State.update(Key, Status="Done" if Result["Status"] == "Done" else "Failed", Stage="Execute", Error=Result.get("Error"))
+            if Result["Status"] != "Done":
+                self.report(ShardName, "Failed to execute " + Key + ": " + Result["Error"] + ", see " + LogPath)
+        self.report(ShardName, "Editor finished in " + "{:.1f}".format(time.perf_counter() - StartTime) + "s")
+
+    def runShard(self, ShardName, Keys):
+        LogPath = self.Directory + "Logs/" + ShardName + ".log"
+        Remaining = [Key for Key in Keys if self.State.get(Key)["Status"] != "Done"]
+        if not Remaining:
+            self.report(ShardName, "Already imported")
+            return
+        self.report(ShardName, "Importing " + str(len(Remaining)) + " of " + str(len(Keys)) + " files")
+        Planned = [Key for Key in Remaining if self.planJob(ShardName, Key, LogPath)]
+        if Planned:
+            self.executePlans(ShardName, Planned, LogPath)
+
+    # Run every shard and return the number of jobs that failed
+    def run(self):
+        Shards = createShards(self.Jobs)
+        print("Importing " + str(len(self.Jobs)) + " files in " + str(len(Shards)) + " shards with " + str(self.Workers) + " workers")
+        StartTime = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.Workers) as Executor: # Each worker only waits on a planner or editor process
+            Futures = {Executor.submit(self.runShard, "Shard" + str(Number) + "_" + Root.strip("/").replace("/", "_"), Keys) : Root for Number, (Root, Keys) in enumerate(Shards)}
+            for Number, Future in enumerate(as_completed(Futures)):
+                try:
+                    Future.result()
+                except Exception as Error:
+                    print("Shard for " + Futures[Future] + " stopped: " + str(Error))
+                print("Finished " + str(Number + 1) + "/" + str(len(Shards)) + " shards")
+        Failed = {Key : self.State.get(Key) for Key in self.Jobs if self.State.get(Key)["Status"] != "Done"}
+        print("Imported " + str(len(self.Jobs) - len(Failed)) + " of " + str(len(self.Jobs)) + " files in " + "{:.1f}".format(time.perf_counter() - StartTime) + "s")
+        for Key, Job in Failed.items():
+            print("  " + Key + " failed during " + Job.get("Stage", "Plan").lower() + ": " + str(Job.get("Error")))
+        if Failed:
+            print("Run the batch again to retry the failed files")
+        return len(Failed)
+
+def main():
+    Parser = argparse.ArgumentParser(description="Import a batch of Figma files using several headless editors")
+    Parser.add_argument("BatchFile", help="JSON file listing the files to import")
+    Parser.add_argument("--project", required=True, help="Path to the .uproject to import into")
+    Parser.add_argument("--editor", required=True, help="Path to UnrealEditor-Cmd")
+    Parser.add_argument("--workers", type=int, default=4, help="Number of shards imported at once")
+    Parser.add_argument("--atlas", action="store_true", help="Pack small images into atlases (needs Pillow)")
+    Parser.add_argument("--fonts", help="Folder of font files named by PostScript name to use before fetching fonts from Google Fonts")
+    Parser.add_argument("--timeout", type=float, help="Seconds before a planner or editor process is stopped")
+    Parser.add_argument("--restart", action="store_true", help="Forget the progress of earlier runs and import every file again")
+    Parser.add_argument("--replan", action="store_true", help="Plan files again even if an earlier run already planned them")
+    Arguments = Parser.parse_args()
+    with open(Arguments.BatchFile, 'r') as handler:
+        Batch = json.load(handler)
+    AccessToken = os.environ.get(AccessTokenVariable) or Batch.get("AccessToken")
+    if not AccessToken:
+        Parser.error("Set " + AccessTokenVariable + " or AccessToken in the batch file")
+    Import = BatchImport(createJobs(Batch["Files"]), Arguments.project, Arguments.editor, AccessToken, Arguments.workers, Arguments.atlas, Arguments.timeout, Arguments.restart, Arguments.replan, Arguments.fonts)
+    sys.exit(1 if Import.run() else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# Runs inside a headless editor started by runBatchImport.py and executes every plan in one shard
+# Started with: UnrealEditor-Cmd <Project>.uproject -run=pythonscript -script="<Path>/runBatchShard.py <ShardPath>"
+# The result of each plan is written as soon as it finishes so a crash only loses the plan being executed
+
+import sys
+import json
+import os
+import traceback
+import figmaApi
+
+def saveResults(Results, Path):
+    with open(Path + ".part", 'w') as handler:
+        json.dump(Results, handler, indent=4)
+    os.replace(Path + ".part", Path)
+
+def runShard(ShardPath):
+    with open(ShardPath, 'r') as handler:
+        Shard = json.load(handler)
+    Results = {}
+    for Number, (Key, PlanPath) in enumerate(Shard["Plans"].items()):
+        print("Executing plan " + str(Number + 1) + "/" + str(len(Shard["Plans"])) + " for " + Key)
+        try:
+            figmaApi.PlanExecutor(figmaApi.loadPlan(PlanPath)).execute()
+            Results[Key] = {"Status" : "Done"}
+        except Exception as Error:
+            traceback.print_exc()
+            Results[Key] = {"Status" : "Failed", "Error" : str(Error)}
+        saveResults(Results, Shard["ResultPath"])
+
+runShard(sys.argv[1])
@@ -0,0 +1,190 @@
+# Times a full import outside of Unreal using figmaReplay in place of the Figma API and fakeUnreal in place of the editor
+# Run with a normal Python that has the importer's requirements installed, for example:
+#   python runBenchmark.py --nodes 1000 10000 50000 --output results.json
+#   python runBenchmark.py --nodes 10000 --baseline results.json
+# A real file can be recorded once with --record and then replayed with --replay so the same file can be timed again and again
+# Each document is imported cold, then reimported unchanged, then reimported after editing 1% of its nodes
+
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+import fakeUnreal
+sys.modules["unreal"] = fakeUnreal # Must be in place before figmaApi is imported
+import figmaApi
+import figmaPlanner
+import figmaReplay
+
+# Records the time, requests, saves and peak memory of each phase, excluding any phases nested inside it
+class PhaseRecorder():
+    def __init__(self, TrackMemory):
+        self.TrackMemory = TrackMemory
+        self.Session = None
+        self.Results = {}
+        self.Stack = []
+
+    def getCounters(self):
+        return {
+                    "Seconds" : time.perf_counter(),
+                    "ApiRequests" : self.Session.getApiRequestCount() if self.Session else 0,
+                    "Downloads" : self.Session.Requests["download"] if self.Session else 0,
+                    "SaveCalls" : fakeUnreal.Calls["EditorAssetLibrary.save_loaded_assets"] + fakeUnreal.Calls["EditorAssetLibrary.save_loaded_asset"],
+                    "SavedAssets" : fakeUnreal.Calls["SavedAssets"]
+                }
+
+    def getPeakMemory(self):
+        return tracemalloc.get_traced_memory()[1] if self.TrackMemory else 0
+
+    def start(self, Name):
+        if self.Stack: # The peak is reset for the nested phase so keep the peak reached so far by the outer one
+            self.Stack[-1]["Peak"] = max(self.Stack[-1]["Peak"], self.getPeakMemory())
+        if self.TrackMemory:
+            tracemalloc.reset_peak()
+        self.Stack.append({"Name" : Name, "Start" : self.getCounters(), "Nested" : {}, "Peak" : 0})
+
+    def stop(self):
+        Phase = self.Stack.pop()
+        End = self.getCounters()
+        Peak = max(Phase["Peak"], self.getPeakMemory())
+        Total = {Key : End[Key] - Phase["Start"][Key] for Key in End}
+        Result = self.Results.setdefault(Phase["Name"], {Key : 0 for Key in End})
+        for Key in Total:
+            Result[Key] += Total[Key] - Phase["Nested"].get(Key, 0)
+        Result["PeakMB"] = max(Result.get("PeakMB", 0), Peak / (1024 * 1024))
+        if self.Stack:
+            Parent = self.Stack[-1]
+            Parent["Peak"] = max(Parent["Peak"], Peak)
+            for Key in Total:
+                Parent["Nested"][Key] = Parent["Nested"].get(Key, 0) + Total[Key]
+
+    # Replaces the importer's phase timer with one that also records each phase here, so the phases match the import profile
+    def wrap(self):
+        Method = figmaPlanner.Profiler.phase
+        @contextmanager
+        def recordPhase(Profiler, Name):
+            self.start(Name)
+            try:
+                with Method(Profiler, Name):
+                    yield
+            finally:
+                self.stop()
+        figmaPlanner.Profiler.phase = recordPhase
+        return Method
+
+# Runs one import and returns the results of each phase along with totals for the whole import
+def runImport(Name, Session, FileID, Pages, AtlasImages, TrackMemory):
+    fakeUnreal.Calls.clear()
+    Recorder = PhaseRecorder(TrackMemory)
+    Recorder.Session = Session
+    Original = Recorder.wrap()
+    if TrackMemory:
+        tracemalloc.start()
+    StartTime = time.perf_counter()
+    Document = None
+    try:
+        Document = figmaApi.FigmaDocument(FileID, "/Game/Benchmark/", "", Pages, AtlasImages=AtlasImages, Session=Session)
+        Document.writeToUnreal()
+    finally:
+        TotalTime = time.perf_counter() - StartTime
+        if TrackMemory:
+            tracemalloc.stop()
+        figmaPlanner.Profiler.phase = Original
+    Session.Requests.clear()
+    return {
+                "Name" : Name,
+                "Seconds" : TotalTime,
+                "ApiRequests" : sum(Phase["ApiRequests"] for Phase in Recorder.Results.values()),
+                "Downloads" : sum(Phase["Downloads"] for Phase in Recorder.Results.values()),
+                "SaveCalls" : sum(Phase["SaveCalls"] for Phase in Recorder.Results.values()),
+                "SavedAssets" : sum(Phase["SavedAssets"] for Phase in Recorder.Results.values()),
+                "PeakMB" : max(Phase["PeakMB"] for Phase in Recorder.Results.values()),
+                "Imports" : fakeUnreal.Calls["ImportedTextures"],
+                "Widgets" : fakeUnreal.Calls["BuiltWidgets"],
+                "Calls" : {Call : Count for Call, Count in fakeUnreal.Calls.items() if "." in Call},
+                "Phases" : Recorder.Results,
+                "Profile" : Document.Profiler.getReport() # The importer's own profile including per node type timings
+            }
+
+def printRun(Run, Baseline = None):
+    Comparison = ""
+    if Baseline:
+        Comparison = " ({:+.1f}% vs baseline)".format((Run["Seconds"] / Baseline["Seconds"] - 1) * 100) if Baseline["Seconds"] else ""
+    print("\n" + Run["Name"] + ": " + "{:.2f}".format(Run["Seconds"]) + "s" + Comparison + ", " + str(Run["ApiRequests"]) + " API requests, " + str(Run["Downloads"]) + " downloads, " +
+          str(Run["SaveCalls"]) + " save calls saving " + str(Run["SavedAssets"]) + " assets, " + str(Run["Imports"]) + " textures imported, " + str(Run["Widgets"]) + " widgets built, peak " + "{:.1f}".format(Run["PeakMB"]) + "MB")
+    print("  {:<18}{:>10}{:>14}{:>11}{:>11}{:>11}".format("Phase", "Seconds", "API requests", "Downloads", "Saves", "Peak MB"))
+    for PhaseName, Phase in Run["Phases"].items():
+        print("  {:<18}{:>10.3f}{:>14}{:>11}{:>11}{:>11.1f}".format(PhaseName, Phase["Seconds"], Phase["ApiRequests"], Phase["Downloads"], Phase["SaveCalls"], Phase["PeakMB"]))
+
+# Imports a document cold, again unchanged, and again after a small edit, all into the same fresh project directory
+def runScenarios(Name, Session, FileID, Pages, Arguments, File = None):
+    ProjectDirectory = tempfile.mkdtemp(prefix="FigmaBenchmark")
+    fakeUnreal.reset(ProjectDirectory)
+    Runs = []
+    try:
+        Runs.append(runImport(Name + " cold", Session, FileID, Pages, Arguments.atlas, not Arguments.no_memory))
+        Runs.append(runImport(Name + " unchanged", Session, FileID, Pages, Arguments.atlas, not Arguments.no_memory))
+        if File is not None:
+            figmaReplay.editSyntheticFile(File, 0.01, Arguments.seed)
+            Runs.append(runImport(Name + " edited", Session, FileID, Pages, Arguments.atlas, not Arguments.no_memory))
+    finally:
+        if Arguments.keep:
+            print("Kept project directory " + ProjectDirectory)
+        else:
+            shutil.rmtree(ProjectDirectory, ignore_errors=True)
+    return Runs
+
+def main():
+    Parser = argparse.ArgumentParser(description="Benchmark the Figma importer against synthetic or recorded documents")
+    Parser.add_argument("--nodes", type=int, nargs="*", default=[1000, 10000, 50000], help="Sizes of synthetic documents to import")
+    Parser.add_argument("--seed", type=int, default=0)
+    Parser.add_argument("--latency", type=float, default=0, help="Seconds added to every request")
+    Parser.add_argument("--rate-limit", type=float, default=0, help="Fraction of API requests answered with a 429")
+    Parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After sent with each 429")
+    Parser.add_argument("--pages", type=int, nargs="*", default=[-1], help="Indices of the pages to import, -1 for all")
+    Parser.add_argument("--atlas", action="store_true", help="Pack small images into atlases (needs Pillow)")
+    Parser.add_argument("--no-memory", action="store_true", help="Don't trace memory, tracing slows every phase down")
+    Parser.add_argument("--record", metavar="DIRECTORY", help="Import --file-id from the Figma API with --token and record the responses")
+    Parser.add_argument("--replay", metavar="DIRECTORY", help="Import --file-id from responses recorded with --record")
+    Parser.add_argument("--file-id", help="File to record or replay")
+    Parser.add_argument("--token", help="Personal access token used when recording")
+    Parser.add_argument("--output", help="Write the results to a JSON file")
+    Parser.add_argument("--baseline", help="Compare against results written by an earlier --output")
+    Parser.add_argument("--keep", action="store_true", help="Keep the temporary project directories")
+    Arguments = Parser.parse_args()
+
+    if Arguments.record:
+        ProjectDirectory = tempfile.mkdtemp(prefix="FigmaRecording")
+        fakeUnreal.reset(ProjectDirectory)
+        Session = figmaReplay.RecordingSession(figmaPlanner.createSession(figmaPlanner.DownloadWorkers), Arguments.record)
+        figmaApi.FigmaDocument(Arguments.file_id, "/Game/Recording/", Arguments.token, Arguments.pages, Session=Session).writeToUnreal()
+        Session.save()
+        shutil.rmtree(ProjectDirectory, ignore_errors=True)
+        print("Recorded " + str(len(Session.Index)) + " responses to " + Arguments.record)
+        return
+
+    Runs = []
+    if Arguments.replay:
+        Session = figmaReplay.ReplaySession(Arguments.replay, Arguments.latency, Arguments.rate_limit, Arguments.retry_after, Arguments.seed)
+        Runs += runScenarios(Arguments.file_id, Session, Arguments.file_id, Arguments.pages, Arguments)
+    else:
+        for NodeCount in Arguments.nodes:
+            File = figmaReplay.createSyntheticFile(NodeCount, Arguments.seed)
+            Session = figmaReplay.SyntheticSession(File, Arguments.latency, Arguments.rate_limit, Arguments.retry_after, Arguments.seed)
+            Runs += runScenarios(str(NodeCount) + " nodes", Session, "Synthetic" + str(NodeCount), Arguments.pages, Arguments, File)
+
+    Baseline = {}
+    if Arguments.baseline:
+        with open(Arguments.baseline, 'r') as handler:
+            Baseline = {Run["Name"] : Run for Run in json.load(handler)["Runs"]}
+    for Run in Runs:
+        printRun(Run, Baseline.get(Run["Name"]))
+    if Arguments.output:
+        with open(Arguments.output, 'w') as handler:
+            json.dump({"Arguments" : vars(Arguments), "Runs" : Runs}, handler, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import figmaPlanner
+import figmaApi
+from importlib import *
+reload(figmaPlanner)
+reload(figmaApi)
+
+PlanPath = "<YourPlanPathHere>" #Plan written by figmaPlanner.py, its images must be in this project's RawAssets folder
+Plan = figmaApi.loadPlan(PlanPath)
+figmaApi.PlanExecutor(Plan).execute()
@@ -1,12 +1,17 @@
+import figmaPlanner
 import figmaApi
 from importlib import *
+reload(figmaPlanner)
 reload(figmaApi)
 
 AccessToken = "<YourAccessTokenHere>"
 ImportDirectory = "/Game/"
 FileID = "<YourFileIDHere>"
 Pages = [-1] #List of pages to import (zero indexed), -1 imports all pages in the document
-FileDocument = figmaApi.FigmaDocument(FileID, ImportDirectory, AccessToken, Pages)
+DownloadWorkers = 8 #Number of images to download at once
+AtlasImages = False #Pack small images into shared atlas textures per page and component (requires Pillow)
+FontDirectory = None #Folder of font files named by PostScript name used before fetching fonts from Google Fonts
+FileDocument = figmaApi.FigmaDocument(FileID, ImportDirectory, AccessToken, Pages, DownloadWorkers, AtlasImages=AtlasImages, FontDirectory=FontDirectory)
 FileDocument.writeToUnreal()
 
 
@@ -10,6 +10,49 @@ UFigmaImporterBPLibrary::UFigmaImporterBPLibrary(const FObjectInitializer& Objec
 
 }
 
+// Classes and textures loaded by path are cached for the whole editor session so repeated children don't repeat the lookup
+static TMap<FString, TWeakObjectPtr<UClass>> LoadedClasses;
+static TMap<FString, TWeakObjectPtr<UTexture2D>> LoadedTextures;
+
+// Counters for the current import, read and reset from Python
+static FFigmaImporterStats Stats;
+
+// Loads a UserWidget class from a blueprint class path, using the cache where possible
+static UClass* LoadChildClass(const FString& ChildClassPath)
+{
+	if (TWeakObjectPtr<UClass>* CachedClass = LoadedClasses.Find(ChildClassPath)) {
+		if (CachedClass->IsValid() && !(*CachedClass)->HasAnyClassFlags(CLASS_NewerVersionExists)) {
+			Stats.ClassCacheHits++;
+			return CachedClass->Get();
+		}
+	}
+	Stats.LoadClassCalls++;
+	FString BaseText = TEXT("WidgetBlueprint '");
+	FString FullPath = BaseText.Append(ChildClassPath).Append(TEXT("'"));
+	UClass* ChildBPWidgetClass = LoadClass<UUserWidget>(NULL, *FullPath);
+	if (ChildBPWidgetClass) {
+		LoadedClasses.Add(ChildClassPath, ChildBPWidgetClass);
+	}
+	return ChildBPWidgetClass;
+}
+
+// Loads a texture from a path, using the cache where possible
+static UTexture2D* LoadTexture(const FString& ImagePath)
+{
+	if (TWeakObjectPtr<UTexture2D>* CachedTexture = LoadedTextures.Find(ImagePath)) {
+		if (CachedTexture->IsValid()) {
+			Stats.TextureCacheHits++;
+			return CachedTexture->Get();
+		}
+	}
+	Stats.LoadObjectCalls++;
+	UTexture2D* Texture = LoadObject<UTexture2D>(NULL, *ImagePath, NULL, LOAD_None, NULL);
+	if (Texture) {
+		LoadedTextures.Add(ImagePath, Texture);
+	}
+	return Texture;
+}
+
 // Helper function to set slot properties of a widget
 void UFigmaImporterBPLibrary::SetWidgetSizeAndPosition(UWidget* Widget, FVector2D Size, FVector2D Position, FVector2D Alignment, FVector2D MinAnchors, FVector2D MaxAnchors)
 {
@@ -62,9 +105,7 @@ UUserWidget* UFigmaImporterBPLibrary::AddChildWidget(UWidgetBlueprint* Widget, F
 	if(IsValid(Widget)) {
 		Widget->Modify(); // Ensures asset is marked dirty for saving
 
-		FString BaseText = TEXT("WidgetBlueprint '");
-		FString FullPath = BaseText.Append(ChildClassPath).Append(TEXT("'"));
-		if (UClass* ChildBPWidgetClass = LoadClass<UUserWidget>(NULL, *FullPath))
+		if (UClass* ChildBPWidgetClass = LoadChildClass(ChildClassPath))
 		{
 			auto WidgetTree = Widget->WidgetTree;
 			UUserWidget* ChildWidget = WidgetTree->ConstructWidget<UUserWidget>(ChildBPWidgetClass, ChildWidgetName);
@@ -92,7 +133,7 @@ UImage* UFigmaImporterBPLibrary::AddImageWidget(UWidgetBlueprint* Widget, FName
 		UImage* Image = WidgetTree->ConstructWidget<UImage>(UImage::StaticClass(), Name);
 		auto Canvas = Cast<UCanvasPanel>(WidgetTree->FindWidget("ContentPanel"));
 		Canvas->AddChild(Image);
-		UTexture2D* Texture = LoadObject<UTexture2D>(NULL, *ImagePath, NULL, LOAD_None, NULL);
+		UTexture2D* Texture = LoadTexture(ImagePath);
 		Image->SetBrushFromTexture(Texture, false);
 		SetWidgetSizeAndPosition(Image, Size, Position, Alignment, MinAnchors, MaxAnchors);
 		return Image;
@@ -142,3 +183,107 @@ UTextBlock* UFigmaImporterBPLibrary::AddTextWidget(UWidgetBlueprint* Widget, FNa
 	}
 }
 
+// Adds every child of a frame to a parent Frame template in one call, finding the content panel and marking the asset dirty only once
+TArray<UWidget*> UFigmaImporterBPLibrary::BuildWidgets(UWidgetBlueprint* Widget, const TArray<FFigmaWidgetSpec>& Specs)
+{
+	TArray<UWidget*> Widgets;
+	if (!IsValid(Widget)) {
+		UE_LOG(LogTemp, Warning, TEXT("Couldn't build widgets for frame as frame not valid"));
+		return Widgets;
+	}
+	Widget->Modify(); // Ensures asset is marked dirty for saving
+	auto WidgetTree = Widget->WidgetTree;
+	auto Canvas = Cast<UCanvasPanel>(WidgetTree->FindWidget("ContentPanel"));
+	if (!Canvas) {
+		UE_LOG(LogTemp, Warning, TEXT("Couldn't build widgets for frame as it has no content panel"));
+		return Widgets;
+	}
+	const double StartTime = FPlatformTime::Seconds();
+	Widgets.Reserve(Specs.Num());
+	for (const FFigmaWidgetSpec& Spec : Specs) {
+		UWidget* ChildWidget = NULL;
+		switch (Spec.Type) {
+		case EFigmaWidgetType::Child:
+			if (UClass* ChildBPWidgetClass = LoadChildClass(Spec.AssetPath)) {
+				ChildWidget = WidgetTree->ConstructWidget<UUserWidget>(ChildBPWidgetClass, Spec.Name);
+			}
+			else {
+				UE_LOG(LogTemp, Warning, TEXT("Couldn't load widget class %s"), *Spec.AssetPath);
+			}
+			break;
+		case EFigmaWidgetType::Image: {
+			UImage* Image = WidgetTree->ConstructWidget<UImage>(UImage::StaticClass(), Spec.Name);
+			if (Spec.UVRegion == FVector4(0, 0, 1, 1)) {
+				Image->SetBrushFromTexture(LoadTexture(Spec.AssetPath), false);
+			}
+			else { // Image is one region of an atlas texture
+				FSlateBrush Brush;
+				Brush.SetResourceObject(LoadTexture(Spec.AssetPath));
+				Brush.SetUVRegion(FBox2f(FVector2f(Spec.UVRegion.X, Spec.UVRegion.Y), FVector2f(Spec.UVRegion.Z, Spec.UVRegion.W)));
+				Brush.ImageSize = Spec.Size;
+				Image->SetBrush(Brush);
+			}
+			ChildWidget = Image;
+			break;
+		}
+		case EFigmaWidgetType::Rectangle: {
+			UImage* Image = WidgetTree->ConstructWidget<UImage>(UImage::StaticClass(), Spec.Name);
+			if (Spec.CornerRadii == FVector4(0, 0, 0, 0) && Spec.OutlineWidth <= 0) {
+				Image->SetColorAndOpacity(Spec.Color);
+			}
+			else { // Rounded corners and outlines are drawn by a rounded box brush so no texture is needed
+				FSlateBrush Brush;
+				Brush.DrawAs = ESlateBrushDrawType::RoundedBox;
+				Brush.TintColor = FSlateColor(Spec.Color);
+				Brush.OutlineSettings = FSlateBrushOutlineSettings(Spec.CornerRadii, FSlateColor(Spec.OutlineColor), Spec.OutlineWidth);
+				Image->SetBrush(Brush);
+			}
+			ChildWidget = Image;
+			break;
+		}
+		case EFigmaWidgetType::Text: {
+			UTextBlock* TextBlock = WidgetTree->ConstructWidget<UTextBlock>(UTextBlock::StaticClass(), Spec.Name);
+			TextBlock->SetText(FText::AsCultureInvariant(Spec.Text));
+			TextBlock->SetFont(Spec.Font);
+			TextBlock->SetColorAndOpacity(FSlateColor(Spec.Color));
+			ChildWidget = TextBlock;
+			break;
+		}
+		}
+		if (ChildWidget) {
+			Canvas->AddChild(ChildWidget);
+			SetWidgetSizeAndPosition(ChildWidget, Spec.Size, Spec.Position, Spec.Alignment, Spec.MinAnchors, Spec.MaxAnchors);
+			Widgets.Add(ChildWidget);
+		}
+	}
+	Stats.BuildWidgetsCalls++;
+	Stats.WidgetsBuilt += Widgets.Num();
+	Stats.BuildWidgetsSeconds += FPlatformTime::Seconds() - StartTime;
+	return Widgets;
+}
+
+// Replaces the typefaces of a font with a single font face, loaded at runtime rather than baked into the font asset
+void UFigmaImporterBPLibrary::SetFontFace(UFont* Font, UFontFace* FontFace, FName TypefaceName)
+{
+	if (IsValid(Font) && IsValid(FontFace)) {
+		Font->Modify(); // Ensures asset is marked dirty for saving
+		Font->FontCacheType = EFontCacheType::Runtime;
+		Font->CompositeFont = FCompositeFont();
+		Font->CompositeFont.DefaultTypeface.Fonts.Add(FTypefaceEntry(TypefaceName, FontFace));
+		Font->PostEditChange();
+	}
+	else {
+		UE_LOG(LogTemp, Warning, TEXT("Couldn't set font face as font or font face not valid"));
+	}
+}
+
+// Gets the counters collected since they were last reset
+FFigmaImporterStats UFigmaImporterBPLibrary::GetStats()
+{
+	return Stats;
+}
+
+void UFigmaImporterBPLibrary::ResetStats()
+{
+	Stats = FFigmaImporterStats();
+}
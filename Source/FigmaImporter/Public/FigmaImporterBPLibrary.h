@@ -16,10 +16,109 @@
 #include "Editor/UMGEditor/Public/WidgetBlueprint.h"
 #include "Runtime/SlateCore/Public/Fonts/SlateFontInfo.h"
 #include "Runtime/Engine/Classes/Engine/Texture2D.h"
+#include "Runtime/Engine/Classes/Engine/Font.h"
+#include "Runtime/Engine/Classes/Engine/FontFace.h"
 //~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 #include "Kismet/BlueprintFunctionLibrary.h"
 #include "FigmaImporterBPLibrary.generated.h"
 
+// Type of widget described by a widget spec
+UENUM(BlueprintType)
+enum class EFigmaWidgetType : uint8
+{
+	Child,
+	Image,
+	Rectangle,
+	Text
+};
+
+// Everything needed to add one child to a Frame template, so a whole frame can be built in a single call
+USTRUCT(BlueprintType)
+struct FFigmaWidgetSpec
+{
+	GENERATED_BODY()
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	EFigmaWidgetType Type = EFigmaWidgetType::Image;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FName Name;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FVector2D Size = FVector2D::ZeroVector;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FVector2D Position = FVector2D::ZeroVector;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FVector2D Alignment = FVector2D::ZeroVector;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FVector2D MinAnchors = FVector2D::ZeroVector;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FVector2D MaxAnchors = FVector2D::ZeroVector;
+
+	// Colour of rectangles and text
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FLinearColor Color = FLinearColor::White;
+
+	// Corner radii of rectangles in the order top left, top right, bottom right, bottom left
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FVector4 CornerRadii = FVector4(0, 0, 0, 0);
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FLinearColor OutlineColor = FLinearColor::Transparent;
+
+	// Width of the outline drawn inside the edge of rectangles, no outline is drawn if zero
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	float OutlineWidth = 0;
+
+	// Class path for child widgets or texture path for images
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FString AssetPath;
+
+	// Region of the texture shown by images as min x, min y, max x, max y in UV space, used for images packed into an atlas
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FVector4 UVRegion = FVector4(0, 0, 1, 1);
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FString Text;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	FSlateFontInfo Font;
+};
+
+// Counters kept by the library so imports can report how much work was done in C++, reset at the start of each import
+USTRUCT(BlueprintType)
+struct FFigmaImporterStats
+{
+	GENERATED_BODY()
+
+	// Widget classes loaded with LoadClass because they weren't cached
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	int32 LoadClassCalls = 0;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	int32 ClassCacheHits = 0;
+
+	// Textures loaded with LoadObject because they weren't cached
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	int32 LoadObjectCalls = 0;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	int32 TextureCacheHits = 0;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	int32 BuildWidgetsCalls = 0;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	int32 WidgetsBuilt = 0;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite)
+	double BuildWidgetsSeconds = 0;
+};
+
 /* 
 *	Function library class.
 *	Each function in it is expected to be static and represents blueprint node that can be called in any blueprint.
@@ -62,4 +161,17 @@ class UFigmaImporterBPLibrary : public UBlueprintFunctionLibrary
 
 		UFUNCTION(BlueprintCallable)
 		static UTextBlock* AddTextWidget(UWidgetBlueprint* Widget, FName Name, FString Content, FSlateFontInfo Font, FVector2D Size, FVector2D Position, FVector2D Alignment, FVector2D MinAnchors, FVector2D MaxAnchors);
+
+		UFUNCTION(BlueprintCallable)
+		static TArray<UWidget*> BuildWidgets(UWidgetBlueprint* Widget, const TArray<FFigmaWidgetSpec>& Specs);
+
+		// Makes a font use a single imported font face as its default typeface so text widgets can use it
+		UFUNCTION(BlueprintCallable)
+		static void SetFontFace(UFont* Font, UFontFace* FontFace, FName TypefaceName);
+
+		UFUNCTION(BlueprintCallable)
+		static FFigmaImporterStats GetStats();
+
+		UFUNCTION(BlueprintCallable)
+		static void ResetStats();
 };